@@ -0,0 +1,63 @@
+# benchmarks/startup.py
+"""
+Замер времени старта CLI: запуск `python -m src.primitive_db.main`
+с командой exit во временном каталоге (медиана по нескольким запускам).
+
+    python benchmarks/startup.py [--runs 10] [--max-ms 250]
+
+Если медиана превышает --max-ms, скрипт завершается с кодом 1 —
+так регрессия времени старта видна в CI/Makefile.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(runs: int) -> list[float]:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    timings = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "src.primitive_db.main"],
+                input="exit\n",
+                text=True,
+                cwd=workdir,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+            timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Время старта CLI базы данных")
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--max-ms", type=float, default=None)
+    args = ap.parse_args()
+
+    timings = measure(args.runs)
+    median = statistics.median(timings)
+    print(
+        f"Старт CLI: медиана {median:.1f} мс, "
+        f"мин {min(timings):.1f} мс, макс {max(timings):.1f} мс "
+        f"({args.runs} запусков)"
+    )
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"Регрессия: медиана больше порога {args.max_ms:.1f} мс")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
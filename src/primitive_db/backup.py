@@ -0,0 +1,224 @@
+# src/primitive_db/backup.py
+
+import json
+import os
+import time
+
+from .decorators import confirm_action
+from .utils import db_base_dir, db_files, table_write_lock
+
+MANIFEST = "manifest.json"
+_COPY_CHUNK = 1024 * 1024
+
+# Снимок: <каталог>/<ГГГГММДД-ЧЧММСС>/ — файлы метаданных, data/ и manifest.json.
+# Основные файлы таблиц и метаданные никогда не меняются на месте (только
+# подменяются целиком через os.replace), поэтому в снимок они попадают жёсткой
+# ссылкой. Журналы дописываются на месте — их копируем до длины на момент снимка.
+
+
+def _is_immutable(rel: str) -> bool:
+    return not rel.endswith(".log")
+
+
+def _file_info(path: str) -> dict:
+    st = os.stat(path)
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "ino": st.st_ino,
+        "dev": st.st_dev,
+    }
+
+
+def _same_file(a: dict | None, b: dict) -> bool:
+    if a is None:
+        return False
+    return all(a.get(k) == b[k] for k in ("size", "mtime_ns", "ino", "dev"))
+
+
+def _sha256(path: str) -> str:
+    # hashlib и shutil импортируются при первом backup/restore, а не при старте CLI
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_COPY_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _copy_prefix(src, dst_path: str, size: int) -> None:
+    """Копирует первые size байт открытого файла src."""
+    with open(dst_path, "wb") as dst:
+        left = size
+        while left > 0:
+            chunk = src.read(min(_COPY_CHUNK, left))
+            if not chunk:
+                break
+            dst.write(chunk)
+            left -= len(chunk)
+
+
+def list_snapshots(target_dir: str) -> list[str]:
+    """Завершённые снимки в каталоге, от старых к новым."""
+    if not os.path.isdir(target_dir):
+        return []
+    return sorted(
+        name
+        for name in os.listdir(target_dir)
+        if os.path.exists(os.path.join(target_dir, name, MANIFEST))
+    )
+
+
+def _load_manifest(snapshot: str) -> dict:
+    with open(os.path.join(snapshot, MANIFEST), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _new_snapshot_path(target_dir: str) -> str:
+    name = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(target_dir, name)
+    n = 2
+    while os.path.exists(path) or os.path.exists(path + ".partial"):
+        path = os.path.join(target_dir, f"{name}-{n}")
+        n += 1
+    return path
+
+
+def backup_database(target_dir: str) -> dict:
+    """
+    Делает согласованный снимок метаданных и всех таблиц в target_dir.
+    Запись блокируется только на время создания жёстких ссылок и открытия
+    журналов; копирование и подсчёт контрольных сумм идут без блокировки.
+    Неизменившиеся с прошлого снимка файлы берутся из него (инкрементально),
+    контрольные суммы для них не пересчитываются.
+    """
+    t0 = time.monotonic()
+    os.makedirs(target_dir, exist_ok=True)
+    snapshots = list_snapshots(target_dir)
+    previous = os.path.join(target_dir, snapshots[-1]) if snapshots else None
+    prev_files = _load_manifest(previous)["files"] if previous else {}
+
+    snapshot = _new_snapshot_path(target_dir)
+    partial = snapshot + ".partial"
+    os.makedirs(partial)
+
+    files: dict[str, dict] = {}
+    pending = []
+    with table_write_lock():
+        for rel, src in db_files():
+            dst = os.path.join(partial, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            info = _file_info(src)
+            files[rel] = info
+            if _is_immutable(rel):
+                try:
+                    os.link(src, dst)
+                    info["method"] = "link"
+                    continue
+                except OSError:
+                    pass  # другая файловая система — копируем ниже
+            pending.append((rel, open(src, "rb"), dst))
+
+    copied_bytes = 0
+    for rel, src, dst in pending:
+        info = files[rel]
+        prev = prev_files.get(rel)
+        with src:
+            if _same_file(prev, info):
+                # файл не менялся с прошлого снимка — ссылка на его копию
+                try:
+                    os.link(os.path.join(previous, rel), dst)
+                    info["method"] = "previous"
+                    continue
+                except OSError:
+                    pass
+            _copy_prefix(src, dst, info["size"])
+            info["method"] = "copy"
+            copied_bytes += info["size"]
+
+    for rel, info in files.items():
+        prev = prev_files.get(rel)
+        if _same_file(prev, info) and "sha256" in prev:
+            info["sha256"] = prev["sha256"]
+        else:
+            info["sha256"] = _sha256(os.path.join(partial, rel))
+
+    manifest = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "files": files}
+    with open(os.path.join(partial, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.rename(partial, snapshot)
+
+    return {
+        "snapshot": snapshot,
+        "files": len(files),
+        "linked": sum(1 for i in files.values() if i["method"] != "copy"),
+        "copied": sum(1 for i in files.values() if i["method"] == "copy"),
+        "copied_bytes": copied_bytes,
+        "seconds": time.monotonic() - t0,
+    }
+
+
+def resolve_snapshot(source_dir: str, name: str | None = None) -> str | None:
+    """
+    Каталог снимка: source_dir/name, сам source_dir (если это снимок)
+    или последний снимок в source_dir.
+    """
+    if name is not None:
+        path = os.path.join(source_dir, name)
+        return path if os.path.exists(os.path.join(path, MANIFEST)) else None
+    if os.path.exists(os.path.join(source_dir, MANIFEST)):
+        return source_dir
+    snapshots = list_snapshots(source_dir)
+    return os.path.join(source_dir, snapshots[-1]) if snapshots else None
+
+
+def verify_snapshot(snapshot: str) -> list[str]:
+    """Файлы снимка, которых нет или у которых не совпала контрольная сумма."""
+    bad = []
+    for rel, info in _load_manifest(snapshot)["files"].items():
+        path = os.path.join(snapshot, rel)
+        if not os.path.exists(path) or _sha256(path) != info["sha256"]:
+            bad.append(rel)
+    return bad
+
+
+@confirm_action("восстановление из резервной копии")
+def restore_database(snapshot: str) -> dict:
+    """
+    Заменяет текущие метаданные и таблицы содержимым снимка.
+    Каждый файл подменяется атомарно; файлы, которых нет в снимке, удаляются.
+    """
+    import shutil
+
+    t0 = time.monotonic()
+    files = _load_manifest(snapshot)["files"]
+    base_dir = db_base_dir()
+
+    with table_write_lock():
+        for rel, path in db_files():
+            if rel not in files:
+                os.remove(path)
+
+        for rel in files:
+            src = os.path.join(snapshot, rel)
+            dst = os.path.join(base_dir, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            tmp = dst + ".restore"
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            # журналы копируем: журнал дописывается на месте,
+            # и ссылка испортила бы снимок
+            if rel.endswith(".log") or not _try_link(src, tmp):
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+
+    return {"files": len(files), "seconds": time.monotonic() - t0}
+
+
+def _try_link(src: str, dst: str) -> bool:
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,87 @@
+# src/primitive_db/compaction.py
+
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from .constants import (
+    COMPACTION_INTERVAL,
+    COMPACTION_IO_BUDGET,
+    COMPACTION_MIN_LOG_BYTES,
+)
+from .utils import compact_table_data, table_log_size
+
+_state = {"thread": None, "stop": None, "io_budget": None}
+
+# последние результаты фоновой компакции: (таблица, отчёт)
+_history: deque = deque(maxlen=10)
+
+
+def _loop(
+    list_tables: Callable[[], list[str]], stop: threading.Event, io_budget: int
+) -> None:
+    while not stop.wait(COMPACTION_INTERVAL):
+        for table in list_tables():
+            if stop.is_set():
+                return
+            if table_log_size(table) < COMPACTION_MIN_LOG_BYTES:
+                continue
+            try:
+                report = compact_table_data(table, io_budget, stop)
+            except Exception as e:
+                # повреждённая таблица не должна останавливать поток
+                report = {"error": f"{type(e).__name__}: {e}"}
+            if report is not None:
+                report["at"] = time.strftime("%H:%M:%S")
+                _history.append((table, report))
+
+
+def start_background_compaction(
+    list_tables: Callable[[], list[str]], io_budget: int = COMPACTION_IO_BUDGET
+) -> bool:
+    """
+    Запускает фоновый поток, который сливает журналы таблиц
+    (больше COMPACTION_MIN_LOG_BYTES) с основными файлами, записывая
+    не быстрее io_budget байт/с. False — если поток уже запущен.
+    """
+    if _is_running():
+        return False
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_loop,
+        args=(list_tables, stop, io_budget),
+        name="compaction",
+        daemon=True,
+    )
+    _state.update(thread=thread, stop=stop, io_budget=io_budget)
+    thread.start()
+    return True
+
+
+def stop_background_compaction() -> bool:
+    """
+    Останавливает фоновую компакцию, прерывая запись текущей таблицы
+    (её журнал сольётся при следующем запуске). False — если она не была запущена.
+    """
+    thread = _state["thread"]
+    if thread is None:
+        return False
+    running = thread.is_alive()
+    _state["stop"].set()
+    thread.join()
+    _state.update(thread=None, stop=None, io_budget=None)
+    return running
+
+
+def _is_running() -> bool:
+    thread = _state["thread"]
+    return thread is not None and thread.is_alive()
+
+
+def compaction_status() -> dict:
+    return {
+        "running": _is_running(),
+        "io_budget": _state["io_budget"],
+        "history": list(_history),
+    }
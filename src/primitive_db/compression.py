@@ -0,0 +1,148 @@
+# src/primitive_db/compression.py
+
+import json
+import struct
+
+# Формат сжатой таблицы (<таблица>.tbl):
+#   MAGIC (4 байта) | кодек (1 байт) | длина заголовка (4 байта, big-endian)
+#   | заголовок JSON | блоки столбцов
+# Каждый столбец — отдельный блок, поэтому при проекции распаковываются
+# только нужные столбцы.
+MAGIC = b"PDB1"
+_PREFIX = struct.Struct(">4sBI")
+
+CODEC_IDS = {"columnar": 0, "zlib": 1, "lzma": 2}
+_CODEC_NAMES = {v: k for k, v in CODEC_IDS.items()}
+
+
+# zlib/lzma импортируются только при работе с соответствующим кодеком
+def _compress(codec: str, payload: bytes) -> bytes:
+    match codec:
+        case "zlib":
+            import zlib
+
+            return zlib.compress(payload, 6)
+        case "lzma":
+            import lzma
+
+            return lzma.compress(payload)
+        case _:
+            return payload
+
+
+def _decompress(codec: str, payload: bytes) -> bytes:
+    match codec:
+        case "zlib":
+            import zlib
+
+            return zlib.decompress(payload)
+        case "lzma":
+            import lzma
+
+            return lzma.decompress(payload)
+        case _:
+            return payload
+
+
+def _encode_column(values: list) -> dict:
+    present = [v for v in values if v is not None]
+    if present and len(present) == len(values):
+        # bool: длины серий одинаковых значений (RLE)
+        if all(isinstance(v, bool) for v in values):
+            runs: list[list] = []
+            for v in values:
+                if runs and runs[-1][0] is v:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([v, 1])
+            return {"enc": "rle", "runs": runs}
+
+        # str: словарь уникальных строк + коды
+        if all(isinstance(v, str) for v in values):
+            dictionary: dict[str, int] = {}
+            codes = []
+            for v in values:
+                codes.append(dictionary.setdefault(v, len(dictionary)))
+            return {"enc": "dict", "dict": list(dictionary), "codes": codes}
+
+    return {"enc": "plain", "values": values}
+
+
+def _decode_column(block: dict) -> list:
+    match block["enc"]:
+        case "rle":
+            values = []
+            for v, n in block["runs"]:
+                values.extend([v] * n)
+            return values
+        case "dict":
+            dictionary = block["dict"]
+            return [dictionary[c] for c in block["codes"]]
+        case _:
+            return block["values"]
+
+
+def encode_table(rows: list[dict], codec: str, raw_size: int) -> bytes:
+    """Кодирует записи по столбцам и сжимает каждый столбец кодеком codec."""
+    columns: list[str] = []
+    for row in rows:
+        for name in row:
+            if name not in columns:
+                columns.append(name)
+
+    blocks = []
+    header_cols = []
+    offset = 0
+    for name in columns:
+        encoded = _encode_column([row.get(name) for row in rows])
+        payload = json.dumps(encoded, ensure_ascii=False, separators=(",", ":"))
+        block = _compress(codec, payload.encode("utf-8"))
+        header_cols.append([name, offset, len(block)])
+        blocks.append(block)
+        offset += len(block)
+
+    header = json.dumps(
+        {"count": len(rows), "raw_size": raw_size, "columns": header_cols},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    prefix = _PREFIX.pack(MAGIC, CODEC_IDS[codec], len(header))
+    return prefix + header + b"".join(blocks)
+
+
+def read_header(blob: bytes) -> tuple[str, dict, int]:
+    """Возвращает (кодек, заголовок, смещение начала блоков)."""
+    magic, codec_id, header_len = _PREFIX.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("повреждён файл таблицы (неверная сигнатура)")
+    start = _PREFIX.size
+    header = json.loads(blob[start : start + header_len].decode("utf-8"))
+    return _CODEC_NAMES[codec_id], header, start + header_len
+
+
+def read_file_header(f) -> tuple[str, dict]:
+    """Читает из открытого файла только префикс и заголовок: (кодек, заголовок)."""
+    prefix = f.read(_PREFIX.size)
+    _, _, header_len = _PREFIX.unpack(prefix)
+    codec, header, _ = read_header(prefix + f.read(header_len))
+    return codec, header
+
+
+def decode_table(blob: bytes, columns: list[str] | None = None) -> list[dict]:
+    """Восстанавливает записи; при columns распаковывает только эти столбцы."""
+    codec, header, base = read_header(blob)
+
+    decoded = []
+    for name, offset, length in header["columns"]:
+        if columns is not None and name not in columns:
+            continue
+        block = _decompress(codec, blob[base + offset : base + offset + length])
+        decoded.append((name, _decode_column(json.loads(block.decode("utf-8")))))
+
+    rows = []
+    for i in range(header["count"]):
+        row = {}
+        for name, values in decoded:
+            if values[i] is not None:
+                row[name] = values[i]
+        rows.append(row)
+    return rows
@@ -1,4 +1,18 @@
 
 META_FILE = "db_meta.json"
+STATS_FILE = "db_stats.json"
+OPTIONS_FILE = "db_options.json"
+VIEWS_FILE = "db_views.json"
 DATA_DIR = "data"
 ALLOWED_TYPES = {"int", "str", "bool"}
+COMPRESSION_CODECS = {"none", "columnar", "zlib", "lzma"}
+PLAN_CACHE_SIZE = 256
+
+# фоновая компакция журналов таблиц
+COMPACTION_INTERVAL = 5.0
+COMPACTION_MIN_LOG_BYTES = 64 * 1024
+COMPACTION_IO_BUDGET = 1024 * 1024
+
+# бюджет памяти для сортировки/группировки/distinct, байт
+MEMORY_BUDGET = 64 * 1024 * 1024
+SPILL_PARTITIONS = 8
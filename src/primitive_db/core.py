@@ -5,13 +5,10 @@
 from .constants import ALLOWED_TYPES
 from .decorators import (
     confirm_action,
-    create_cacher,
     handle_db_errors,
     log_time,
 )
-from .utils import load_table_data
-
-_select_cache = create_cacher()
+from .utils import iter_table_rows
 
 
 @handle_db_errors
@@ -87,7 +84,7 @@ def insert(metadata: dict, table_name: str, values: list[str]):
     - проверяет наличие таблицы
     - проверяет соответствие количества значений схеме (без ID)
     - приводит типы согласно схеме (int/str/bool)
-    - генерирует новый ID и возвращает обновлённый список данных
+    - генерирует новый ID и возвращает новую запись (сохраняет её вызывающий)
     """
     # 0) таблица есть?
     if table_name not in metadata:
@@ -112,10 +109,7 @@ def insert(metadata: dict, table_name: str, values: list[str]):
         )
         return None
 
-    # 4) загружаем текущие данные (для генерации ID)
-    data = load_table_data(table_name)
-
-    # 5) валидация и приведение типов по индексу
+    # 4) валидация и приведение типов по индексу
     validated_fields = {}
     for i in range(len(values)):
         raw_value = str(values[i]).strip()
@@ -153,72 +147,34 @@ def insert(metadata: dict, table_name: str, values: list[str]):
 
         validated_fields[col_name] = coerced
 
-    # 6) новый ID
-    existing_ids = [row.get("ID") for row in data if isinstance(row.get("ID"), int)]
-    new_id = (max(existing_ids) + 1) if existing_ids else 1
+    # 5) новый ID: потоком читаем только столбец ID, таблица целиком не грузится
+    max_id = 0
+    for row in iter_table_rows(table_name, ["ID"]):
+        row_id = row.get("ID")
+        if isinstance(row_id, int) and row_id > max_id:
+            max_id = row_id
+    new_id = max_id + 1
 
-    # 7) запись строго в порядке из non_id_schema
+    # 6) запись строго в порядке из non_id_schema
     record = {"ID": new_id}
     for col_name, _ in non_id_schema:
         record[col_name] = validated_fields[col_name]
 
-    data.append(record)
-    return data
-
-
-def _row_fingerprint(row: dict) -> tuple:
-    # стабильное представление строки: пары (ключ, значение), отсортированы по ключу
-    # значения у нас базовых типов (int/bool/str), они хэшируемые
-    return tuple(sorted(row.items(), key=lambda kv: kv[0]))
-
-def _table_fingerprint(rows: list[dict]) -> tuple:
-    # длина + отсортированный набор "отпечатков" строк
-    # порядок строк в файле не важен — сортируем
-    row_fps = []
-    i = 0
-    while i < len(rows):
-        row_fps.append(_row_fingerprint(rows[i]))
-        i += 1
-    row_fps.sort()
-    return (len(rows), tuple(row_fps))
+    return record
 
 
 @handle_db_errors
 @log_time
-def select(table_data, where_clause=None):
-    # Ключ кэша: тип операции + полный отпечаток таблицы + условие
-    where_key = None
-    if where_clause is not None:
-        where_items = sorted(where_clause.items())
-        where_key = tuple(where_items)
-
-    key = ("select", _table_fingerprint(table_data), where_key)
-
-    def _compute():
-        if where_clause is None:
-            # можно вернуть копию, чтобы не делиться ссылкой на исходный список
-            return list(table_data)
-
-        filtered = []
-        i = 0
-        while i < len(table_data):
-            row = table_data[i]
-            match_row = True
-            for k, v in where_clause.items():
-                if k not in row or row[k] != v:
-                    match_row = False
-                    break
-            if match_row:
-                filtered.append(row)
-            i += 1
-        return filtered
-
-    return _select_cache(key, _compute)
-
+def scan(rows, output) -> None:
+    """
+    Потоковый select: передаёт поток записей в output (вывод) без
+    промежуточного списка — для таблиц больше памяти.
+    """
+    output(rows)
 
 
 @handle_db_errors
-def update(table_data, set_clause, where_clause):
+def update(table_data, set_clause, where_clause, unique=False):
     updated_data = []
     updated_count = 0
     i = 0
@@ -226,11 +182,13 @@ def update(table_data, set_clause, where_clause):
         row = table_data[i]
 
         # Проверяем соответствие where_clause
-        match_row = True
+        # (уникальный столбец: после первого совпадения уже не сравниваем)
+        match_row = not (unique and updated_count > 0)
         for key, value in where_clause.items():
+            if not match_row:
+                break
             if key not in row or row[key] != value:
                 match_row = False
-                break
 
         if match_row:
             # Обновляем поля согласно set_clause
@@ -246,18 +204,20 @@ def update(table_data, set_clause, where_clause):
 
 @handle_db_errors
 @confirm_action("удаление записей")
-def delete(table_data, where_clause):
+def delete(table_data, where_clause, unique=False):
     new_data = []
     removed = 0
     i = 0
     while i < len(table_data):
         row = table_data[i]
 
-        match_row = True
+        # уникальный столбец: после первого совпадения уже не сравниваем
+        match_row = not (unique and removed > 0)
         for key, value in where_clause.items():
+            if not match_row:
+                break
             if key not in row or row[key] != value:
                 match_row = False
-                break
 
         if not match_row:
             new_data.append(row)
@@ -267,3 +227,56 @@ def delete(table_data, where_clause):
         i += 1
 
     return new_data
+
+
+def matching_rows(table_data, where_clause) -> list[dict]:
+    """Записи, подходящие под where_clause (те же объекты, без копий)."""
+    return list(filter_rows(table_data, where_clause))
+
+
+def filter_rows(rows, where_clause, unique=False):
+    """
+    Потоковый фильтр: отдаёт подходящие под where_clause записи по одной,
+    так что отфильтрованный просмотр не держит в памяти всю таблицу.
+    """
+    for row in rows:
+        if _row_matches(row, where_clause):
+            yield row
+            if unique:
+                return
+
+
+def _row_matches(row: dict, where_clause) -> bool:
+    if not where_clause:
+        return True
+    for key, value in where_clause.items():
+        if key not in row or row[key] != value:
+            return False
+    return True
+
+
+def view_delta(
+    where_clause,
+    changed_rows: list[dict],
+    removed_ids: set,
+    in_view,
+) -> tuple[list[dict], set]:
+    """
+    Изменения материализованного представления по изменениям базовой таблицы:
+    - removed_ids — ID удалённых из базовой таблицы записей;
+    - changed_rows — вставленные/обновлённые записи базовой таблицы:
+      подходящие под условие попадают в представление (или заменяют
+      прежнюю версию), неподходящие — удаляются из него.
+    in_view(ids) возвращает те из ids, что сейчас есть в представлении;
+    вызывается, только если что-то может из него удалиться.
+    Возвращает (записи для вставки/замены, ID для удаления).
+    Записи сопоставляются по ID: update его не меняет (см. engine._build_plan),
+    поэтому новая версия записи всегда заменяет прежнюю.
+    """
+    put = [dict(row) for row in changed_rows if _row_matches(row, where_clause)]
+    candidates = set(removed_ids)
+    candidates.update(
+        row.get("ID") for row in changed_rows if not _row_matches(row, where_clause)
+    )
+    removed = in_view(candidates) if candidates else set()
+    return put, removed
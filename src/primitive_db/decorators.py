@@ -2,6 +2,7 @@
 
 
 import time
+from collections import OrderedDict
 from typing import Any, Callable
 
 
@@ -80,3 +81,31 @@ def create_cacher() -> Callable[[Any, Callable[[], Any]], Any]:
     return cache_result
 
 
+def create_lru_cacher(
+    maxsize: int,
+) -> Callable[..., Any]:
+    """
+    Как create_cacher, но хранит не больше maxsize значений,
+    вытесняя давно не использованные.
+    cache_result(key, value_func, is_valid=None): если is_valid передан и
+    вернул False для закэшированного значения — значение пересчитывается.
+    """
+    cache: OrderedDict = OrderedDict()
+
+    def cache_result(
+        key,
+        value_func: Callable[[], Any],
+        is_valid: Callable[[Any], bool] | None = None,
+    ):
+        if key in cache:
+            value = cache[key]
+            if is_valid is None or is_valid(value):
+                cache.move_to_end(key)
+                return value
+        value = value_func()
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > maxsize:
+            cache.popitem(last=False)
+        return value
+    return cache_result
@@ -2,25 +2,76 @@
 
 import shlex
 
-from prettytable import PrettyTable
-
-from .constants import META_FILE
+from .backup import (
+    backup_database,
+    resolve_snapshot,
+    restore_database,
+    verify_snapshot,
+)
+from .compaction import (
+    compaction_status,
+    start_background_compaction,
+    stop_background_compaction,
+)
+from .constants import (
+    COMPACTION_IO_BUDGET,
+    COMPRESSION_CODECS,
+    META_FILE,
+    OPTIONS_FILE,
+    PLAN_CACHE_SIZE,
+    STATS_FILE,
+)
 from .core import (
     create_table,
     delete,
     drop_table,
+    filter_rows,
     insert,
     list_tables,
-    select,
+    scan,
     update,
 )
-from .decorators import handle_db_errors
-from .parser import parse_set, parse_where
+from .decorators import create_lru_cacher, handle_db_errors
+from .external import (
+    distinct_rows,
+    external_sort,
+    group_count,
+    memory_budget,
+    row_size,
+    set_memory_budget,
+)
+from .parser import (
+    PARAM,
+    parse_projection,
+    parse_set,
+    parse_value,
+    parse_where,
+)
+from .planner import (
+    PATH_ID_LOOKUP,
+    PATH_SKIP,
+    PATH_TITLES,
+    analyze_table,
+    choose_access_path,
+)
 from .utils import (
+    append_table_log,
+    compact_table_data,
+    iter_table_rows,
     load_metadata,
-    load_table_data,
     save_metadata,
     save_table_data,
+    table_log_size,
+    table_storage_info,
+    table_write_lock,
+)
+from .views import (
+    create_view,
+    drop_view,
+    drop_views_of,
+    load_views,
+    refresh_views,
+    view_source,
 )
 
 
@@ -29,8 +80,12 @@ def print_help() -> None:
     print("\n***Процесс работы с таблицей***")
     print("Функции:")
     print(
-        "<command> create_table <имя_таблицы> <столбец1:тип> <столбец2:тип> .. - "
-        "создать таблицу"
+        "<command> create_table <имя_таблицы> <столбец1:тип> <столбец2:тип> .. "
+        "[compression=<кодек>] - создать таблицу"
+    )
+    print(
+        "<command> alter table <имя_таблицы> set compression <кодек> - "
+        "сменить сжатие (none/columnar/zlib/lzma)"
     )
     print("<command> list_tables - показать список всех таблиц")
     print("<command> drop_table <имя_таблицы> - удалить таблицу")
@@ -42,12 +97,46 @@ def print_help() -> None:
     print(
         "<command> select from <имя_таблицы> [where <col> = <value>] - прочитать записи"
     )
+    print(
+        "<command> select <col1>, <col2> from <имя_таблицы> [where <col> = <value>] - "
+        "прочитать только указанные столбцы"
+    )
+    print(
+        "<command> select [distinct] ... [group by <col>] [order by <col> [desc]] - "
+        "без повторов / число записей по группам / сортировка"
+    )
+    print("<command> set memory_budget [<КБ>] - бюджет памяти для сортировки и групп")
     print(
         "<command> update <имя_таблицы> set <col> = <value> where <col> = <value> - "
         "обновить записи"
     )
     print("<command> delete from <имя_таблицы> where <col> = <value> - удалить записи")
     print("<command> info <имя_таблицы> - информация о таблице")
+    print(
+        "<command> create view <имя> as select from <имя_таблицы> "
+        "[where <col> = <value>] - материализованное представление"
+    )
+    print("<command> drop view <имя> - удалить представление")
+    print(
+        "<command> vacuum <имя_таблицы> - слить журнал изменений с таблицей "
+        "и освободить место"
+    )
+    print(
+        "<command> vacuum auto on [<КБ/с>] | vacuum auto off | vacuum status - "
+        "фоновая очистка"
+    )
+    print("<command> backup to <каталог> - снимок базы (инкрементальный)")
+    print(
+        "<command> restore from <каталог> [<снимок>] - восстановить базу "
+        "из снимка (по умолчанию последнего)"
+    )
+    print("<command> analyze <имя_таблицы> - собрать статистику по столбцам")
+    print("<command> explain <команда> - показать план выполнения команды")
+    print(
+        "<command> prepare <имя> as <команда с ? вместо значений> - "
+        "подготовить выражение"
+    )
+    print("<command> execute <имя> (<v1>, <v2>, ...) - выполнить подготовленное")
 
     print("\nОбщие команды:")
     print("<command> exit - выход из программы")
@@ -56,6 +145,20 @@ def print_help() -> None:
 
 # ---------- helpers (без try/except в run) ----------
 
+# кэш разобранных команд: нормализованный текст -> план
+_plan_cache = create_lru_cacher(PLAN_CACHE_SIZE)
+
+# подготовленные выражения текущей сессии: имя -> план с параметрами
+_prepared: dict[str, dict] = {}
+
+# имя столбца с числом записей в select ... group by
+_COUNT = "count"
+
+_WHERE_FORMAT_ERROR = (
+    "Некорректное значение: where. "
+    "Ожидается формат: поле = значение (строки в кавычках)."
+)
+
 @handle_db_errors
 def _split_args(s: str) -> list[str]:
     """Разбор строки через shlex.split. Ошибки ловит декоратор."""
@@ -151,28 +254,771 @@ def _extract_update_clauses(user_input: str) -> tuple[str, str] | None:
     return (set_str, where_str)
 
 
-def _print_rows(table: str, metadata: dict, rows: list[dict]) -> None:
-    """Красивый вывод записей таблицы с учётом порядка колонок из схемы."""
-    if not rows:
-        headers = [c.split(":", 1)[0] for c in metadata.get(table, [])]
+def _extract_select_parts(user_input: str) -> dict | None:
+    """
+    Разбирает select [distinct] <столбцы> from <таблица> [where ...]
+    [group by <столбец>] [order by <столбец> [asc|desc]].
+    Возвращает словарь частей или None при ошибке.
+    cols пустой, если столбцы не указаны (select from <таблица>).
+    """
+    text = user_input
+    distinct = text.lower().startswith("select distinct ")
+    if distinct:
+        text = "select " + text[len("select distinct ") :]
+
+    low = text.lower()
+    if low.startswith("select from "):
+        cols_str = ""
+        rest = text[len("select from ") :]
+    else:
+        idx_from = _find_keyword_outside_quotes(text, " from ")
+        if idx_from == -1:
+            return None
+        cols_str = text[len("select ") : idx_from].strip()
+        rest = text[idx_from + len(" from ") :]
+
+    rest = rest.strip()
+    table = rest.split(" ", 1)[0]
+    if not table:
+        return None
+    tail = " " + rest[len(table) :].strip()
+
+    # секции в конце: order by — последняя, group by — перед ней
+    order_by = None
+    idx = _find_keyword_outside_quotes(tail, " order by ")
+    if idx != -1:
+        order_parts = tail[idx + len(" order by ") :].split()
+        tail = tail[:idx]
+        if len(order_parts) == 1:
+            order_by = (order_parts[0], False)
+        elif len(order_parts) == 2 and order_parts[1].lower() in ("asc", "desc"):
+            order_by = (order_parts[0], order_parts[1].lower() == "desc")
+        else:
+            return None
+
+    group_by = None
+    idx = _find_keyword_outside_quotes(tail, " group by ")
+    if idx != -1:
+        group_parts = tail[idx + len(" group by ") :].split()
+        tail = tail[:idx]
+        if len(group_parts) != 1:
+            return None
+        group_by = group_parts[0]
+
+    tail = tail.strip()
+    cond_str = None
+    if tail:
+        if not tail.lower().startswith("where"):
+            return None
+        cond_str = _extract_condition_after_where(" " + tail) or ""
+
+    return {
+        "cols": cols_str,
+        "distinct": distinct,
+        "table": table,
+        "where": cond_str,
+        "group_by": group_by,
+        "order_by": order_by,
+    }
+
+
+def _table_headers(table: str, metadata: dict) -> list[str]:
+    return [c.split(":", 1)[0] for c in metadata.get(table, [])]
+
+
+def _print_rows(
+    table: str, metadata: dict, rows, columns: list[str] | None = None
+) -> None:
+    """
+    Красивый вывод записей таблицы с учётом порядка колонок из схемы.
+    Если передан columns — выводятся только эти столбцы в указанном порядке.
+    rows может быть потоком: записи, не помещающиеся в бюджет памяти,
+    выводятся несколькими таблицами подряд.
+    """
+    headers = columns or _table_headers(table, metadata)
+    batch: list[list] = []
+    batch_size = 0
+    printed = False
+    for r in rows:
         if not headers:
-            print("(нет записей)")
-            return
-        t = PrettyTable()
-        t.field_names = headers
-        print(t)
+            headers = list(r.keys())
+        batch.append([r.get(h) for h in headers])
+        batch_size += row_size(r)
+        if batch_size >= memory_budget():
+            _print_table(headers, batch)
+            batch, batch_size, printed = [], 0, True
+
+    if not headers:
+        print("(нет записей)")
         return
+    if batch or not printed:
+        _print_table(headers, batch)
+
+
+def _print_table(headers: list[str], rows: list[list]) -> None:
+    # prettytable импортируется при первом выводе, а не при старте CLI
+    from prettytable import PrettyTable
 
-    headers = [c.split(":", 1)[0] for c in metadata.get(table, [])] or list(
-        rows[0].keys()
-    )
     t = PrettyTable()
     t.field_names = headers
-    for r in rows:
-        t.add_row([r.get(h) for h in headers])
+    t.add_rows(rows)
     print(t)
 
 
+def _normalize_command(s: str) -> str:
+    """Схлопывает пробелы вне кавычек: одинаковые команды -> один ключ кэша."""
+    out: list[str] = []
+    in_quote: str | None = None
+    prev_space = False
+
+    for ch in s.strip():
+        if ch in ("'", '"'):
+            if in_quote is None:
+                in_quote = ch
+            elif in_quote == ch:
+                in_quote = None
+        if in_quote is None and ch.isspace():
+            if not prev_space:
+                out.append(" ")
+            prev_space = True
+            continue
+        out.append(ch)
+        prev_space = False
+    return "".join(out)
+
+
+def _error_plan(message: str, table: str | None = None, metadata=None) -> dict:
+    schema = tuple(metadata.get(table, ())) if table and metadata else None
+    return {"op": "error", "message": message, "table": table, "schema": schema}
+
+
+def _view_write_error(table: str, metadata: dict) -> dict:
+    # таблица и источник — чтобы план устарел, если представление удалят
+    source = view_source(table)
+    plan = _error_plan(
+        f'Ошибка: "{table}" — представление, изменять его напрямую нельзя.',
+        table,
+    )
+    plan.update(source=source, schema=tuple(metadata.get(source, ())))
+    return plan
+
+
+def _build_plan(user_input: str, metadata: dict) -> dict | None:
+    """
+    Разбирает команду работы с данными (insert/select/update/delete) в план.
+    Для прочих команд возвращает None. Ошибки разбора -> план с op='error'.
+    Параметры '?' остаются в плане как PARAM.
+    """
+    try:
+        args = shlex.split(user_input)
+    except ValueError as e:
+        return _error_plan(f"Ошибка валидации: {e}")
+
+    match args:
+        # INSERT: insert into <table> values (...)
+        case ["insert", "into", table, *rest]:
+            if view_source(table) is not None:
+                return _view_write_error(table, metadata)
+            if not rest or rest[0].lower() != "values":
+                return _error_plan(
+                    "Некорректное значение: ожидается 'values (...)'. "
+                    "Попробуйте снова."
+                )
+
+            start = user_input.find("(")
+            end = user_input.rfind(")")
+            if start == -1 or end == -1 or end < start:
+                return _error_plan(
+                    "Некорректное значение: отсутствует список значений в скобках. "
+                    "Попробуйте снова."
+                )
+
+            inner = user_input[start + 1 : end]
+            values = [
+                PARAM if v == "?" else v for v in _split_values_inner(inner)
+            ]
+            return {
+                "op": "insert",
+                "table": table,
+                "schema": tuple(metadata.get(table, ())),
+                "values": values,
+            }
+
+        # SELECT: select [<col1>, <col2> | *] from <table> [where <col> = <value>]
+        case ["select", *_]:
+            # берём части из исходной строки, чтобы не терять кавычки
+            parts = _extract_select_parts(user_input)
+            if parts is None:
+                return _error_plan(
+                    "Некорректное значение: ожидается "
+                    "select [distinct] [<столбцы>] from <таблица> [where ...] "
+                    "[group by <столбец>] [order by <столбец> [asc|desc]]. "
+                    "Попробуйте снова."
+                )
+            table = parts["table"]
+            group_by = parts["group_by"]
+            order_by = parts["order_by"]
+
+            columns = parse_projection(parts["cols"]) if parts["cols"] else []
+            if columns is None:
+                return _error_plan(
+                    "Некорректное значение: список столбцов. "
+                    "Ожидается формат: <столбец1>, <столбец2> или *."
+                )
+
+            # у представления столбцы те же, что у его базовой таблицы
+            source = view_source(table)
+            headers = _table_headers(source or table, metadata)
+            allowed = headers
+            unknown = []
+            if group_by is not None:
+                # group by: выводятся столбец группы и число записей (count)
+                columns = [_COUNT if c == "count(*)" else c for c in columns]
+                columns = columns or [group_by, _COUNT]
+                allowed = [group_by, _COUNT]
+                if headers and group_by not in headers:
+                    unknown.append(group_by)
+            check = columns + ([order_by[0]] if order_by else [])
+            unknown += [c for c in check if headers and c not in allowed]
+            if unknown:
+                return _error_plan(
+                    f'Ошибка: Столбец "{unknown[0]}" не найден '
+                    f'в таблице "{table}".',
+                    table,
+                    metadata,
+                )
+            if parts["distinct"] and columns and order_by:
+                if order_by[0] not in columns:
+                    return _error_plan(
+                        "Некорректное значение: для select distinct столбец "
+                        "order by должен быть в списке столбцов."
+                    )
+
+            where_clause = None
+            if parts["where"] is not None:
+                cond_str = parts["where"]
+                where_clause = parse_where(cond_str) if cond_str else None
+                if where_clause is None:
+                    return _error_plan(_WHERE_FORMAT_ERROR)
+
+            # проекция на уровне хранения: читаем только нужные столбцы
+            # (+ столбцы условия и сортировки, они отрежутся позже)
+            load_cols = None
+            if group_by is not None:
+                load_cols = [group_by]
+            elif columns:
+                load_cols = list(columns)
+                if order_by and order_by[0] not in load_cols:
+                    load_cols.append(order_by[0])
+            if load_cols is not None:
+                for k in where_clause or {}:
+                    if k not in load_cols:
+                        load_cols.append(k)
+
+            return {
+                "op": "select",
+                "table": table,
+                "source": source,
+                "schema": tuple(metadata.get(source or table, ())),
+                "columns": columns or None,
+                "load_columns": load_cols,
+                "where": where_clause,
+                "distinct": parts["distinct"],
+                "group_by": group_by,
+                "order_by": order_by,
+            }
+
+        # UPDATE: update <table> set <col>=<value> where <col>=<value>
+        case ["update", table, "set", *_]:
+            if view_source(table) is not None:
+                return _view_write_error(table, metadata)
+            # извлекаем set/where из исходной строки, сохраняя кавычки
+            clauses = _extract_update_clauses(user_input)
+            if clauses is None:
+                return _error_plan(
+                    "Некорректное значение: отсутствует корректная секция "
+                    "SET/WHERE. Попробуйте снова."
+                )
+            set_str, where_str = clauses
+
+            set_clause = parse_set(set_str)
+            where_clause = parse_where(where_str)
+            if set_clause is None or where_clause is None:
+                return _error_plan(
+                    "Некорректное значение: set/where. "
+                    "Ожидается формат: поле = значение (строки в кавычках)."
+                )
+            # ID неизменяем: по нему журнал накладывает версии записей,
+            # обновляются представления и ищет id_lookup
+            if any(k.lower() == "id" for k in set_clause):
+                return _error_plan(
+                    "Ошибка: Столбец ID нельзя изменять через update.",
+                    table,
+                    metadata,
+                )
+            return {
+                "op": "update",
+                "table": table,
+                "schema": tuple(metadata.get(table, ())),
+                "set": set_clause,
+                "where": where_clause,
+            }
+
+        # DELETE: delete from <table> where <col>=<value>
+        case ["delete", "from", table, "where", *_]:
+            if view_source(table) is not None:
+                return _view_write_error(table, metadata)
+            cond_str = _extract_condition_after_where(user_input)
+            where_clause = parse_where(cond_str) if cond_str else None
+            if where_clause is None:
+                return _error_plan(_WHERE_FORMAT_ERROR)
+            return {
+                "op": "delete",
+                "table": table,
+                "schema": tuple(metadata.get(table, ())),
+                "where": where_clause,
+            }
+
+        case _:
+            return None
+
+
+def _plan_is_fresh(plan: dict | None, metadata: dict) -> bool:
+    """План годен, пока схема его таблицы (и признак представления) не менялись."""
+    if plan is None or plan.get("table") is None:
+        return True
+    source = plan.get("source")
+    if view_source(plan["table"]) != source:
+        return False
+    return plan["schema"] == tuple(metadata.get(source or plan["table"], ()))
+
+
+def _get_plan(user_input: str, metadata: dict) -> dict | None:
+    """План команды из LRU-кэша; разбор выполняется один раз на форму команды."""
+    key = _normalize_command(user_input)
+    return _plan_cache(
+        key,
+        lambda: _build_plan(key, metadata),
+        lambda plan: _plan_is_fresh(plan, metadata),
+    )
+
+
+def _count_params(plan: dict) -> int:
+    count = sum(1 for v in plan.get("values") or [] if v is PARAM)
+    for field in ("set", "where"):
+        count += sum(1 for v in (plan.get(field) or {}).values() if v is PARAM)
+    return count
+
+
+def _bind_plan(plan: dict, raw_args: list[str]) -> dict | None:
+    """
+    Подставляет аргументы execute в параметры плана (по порядку:
+    values, затем set, затем where). Возвращает новый план или None.
+    """
+    if len(raw_args) != _count_params(plan):
+        print(
+            f"Некорректное значение: ожидается параметров: {_count_params(plan)}, "
+            f"передано: {len(raw_args)}. Попробуйте снова."
+        )
+        return None
+
+    bound = dict(plan)
+    args = iter(raw_args)
+
+    if plan.get("values") is not None:
+        # insert приводит типы сам — передаём сырые строки
+        bound["values"] = [next(args) if v is PARAM else v for v in plan["values"]]
+
+    for field in ("set", "where"):
+        clause = plan.get(field)
+        if not clause:
+            continue
+        new_clause = {}
+        for k, v in clause.items():
+            if v is PARAM:
+                raw = next(args)
+                v = parse_value(raw)
+                if v is None or v is PARAM:
+                    print(f"Некорректное значение: {raw}. Попробуйте снова.")
+                    return None
+            new_clause[k] = v
+        bound[field] = new_clause
+
+    return bound
+
+
+def _prepare(name: str, text: str, metadata: dict) -> None:
+    plan = _build_plan(_normalize_command(text), metadata)
+    if plan is None:
+        print(
+            "Некорректное значение: подготовить можно только "
+            "insert/select/update/delete. Попробуйте снова."
+        )
+        return
+    if plan["op"] == "error":
+        print(plan["message"])
+        return
+    plan["text"] = text
+    _prepared[name] = plan
+    print(f'Выражение "{name}" подготовлено (параметров: {_count_params(plan)}).')
+
+
+def _execute_prepared(name: str, user_input: str, metadata: dict) -> None:
+    plan = _prepared.get(name)
+    if plan is None:
+        print(f'Ошибка: Подготовленное выражение "{name}" не найдено.')
+        return
+
+    if not _plan_is_fresh(plan, metadata):
+        # схема таблицы поменялась — разбираем шаблон заново
+        text = plan["text"]
+        plan = _build_plan(_normalize_command(text), metadata)
+        if plan is None or plan["op"] == "error":
+            print(plan["message"] if plan else "Некорректная команда.")
+            return
+        plan["text"] = text
+        _prepared[name] = plan
+
+    raw_args: list[str] = []
+    start = user_input.find("(")
+    end = user_input.rfind(")")
+    if start != -1 and end > start:
+        raw_args = _split_values_inner(user_input[start + 1 : end])
+
+    bound = _bind_plan(plan, raw_args)
+    if bound is not None:
+        _execute_plan(bound, metadata)
+
+
+def _split_compression_option(cols: list[str]) -> tuple[list[str], str | None]:
+    """Отделяет compression=<кодек> от списка столбцов create_table."""
+    codec = None
+    rest = []
+    for col in cols:
+        if col.lower().startswith("compression="):
+            codec = col.split("=", 1)[1].strip().lower()
+        else:
+            rest.append(col)
+    return rest, codec
+
+
+def _set_compression(table: str, codec: str) -> None:
+    """Сохраняет кодек таблицы и перезаписывает её данные в новом формате."""
+    options = load_metadata(OPTIONS_FILE)
+    options.setdefault(table, {})["compression"] = codec
+    save_metadata(OPTIONS_FILE, options)
+    # чтение и перезапись под одной блокировкой: save_table_data удаляет
+    # журнал, и строки, дописанные между ними другим процессом, пропали бы
+    with table_write_lock():
+        save_table_data(table, iter_table_rows(table))
+
+
+def _create_view(name: str, select_text: str, metadata: dict) -> None:
+    plan = _build_plan(_normalize_command(select_text), metadata)
+    if plan is not None and plan["op"] == "error":
+        print(plan["message"])
+        return
+    if (
+        plan is None
+        or plan["op"] != "select"
+        or plan["columns"]
+        or plan["source"]
+        or _count_params(plan)
+        # представление хранит только условие where: остальное потерялось бы
+        or plan["distinct"]
+        or plan["group_by"]
+        or plan["order_by"]
+    ):
+        print(
+            "Некорректное значение: ожидается "
+            "create view <имя> as select from <таблица> [where ...]. "
+            "Попробуйте снова."
+        )
+        return
+    create_view(metadata, name, plan["table"], plan["where"])
+
+
+def _vacuum_report(table: str, report: dict) -> str:
+    return (
+        f'Таблица "{table}": освобождено {report["reclaimed"]} байт '
+        f'(было {report["before"]}, стало {report["after"]}) '
+        f'за {report["seconds"]:.3f} секунд.'
+    )
+
+
+def _vacuum(table: str, metadata: dict) -> None:
+    # у представлений тоже есть журнал изменений
+    if table not in metadata and view_source(table) is None:
+        print(f'Ошибка: Таблица "{table}" не существует.')
+        return
+    report = compact_table_data(table)
+    if report is None:
+        print(f'Таблица "{table}" изменилась во время очистки. Повторите vacuum.')
+        return
+    print(_vacuum_report(table, report))
+
+
+def _start_auto_vacuum(budget: list[str]) -> None:
+    io_budget = COMPACTION_IO_BUDGET
+    if budget:
+        if len(budget) != 1 or not budget[0].isdigit() or int(budget[0]) == 0:
+            print(f"Некорректное значение: {' '.join(budget)}. Попробуйте снова.")
+            return
+        io_budget = int(budget[0]) * 1024
+
+    started = start_background_compaction(
+        lambda: [*load_metadata(META_FILE).keys(), *load_views().keys()], io_budget
+    )
+    if started:
+        print(f"Фоновая очистка запущена (не более {io_budget // 1024} КБ/с).")
+    else:
+        print("Фоновая очистка уже запущена.")
+
+
+def _print_vacuum_status() -> None:
+    status = compaction_status()
+    if status["running"]:
+        print(
+            "Фоновая очистка: запущена "
+            f"(не более {status['io_budget'] // 1024} КБ/с)"
+        )
+    else:
+        print("Фоновая очистка: остановлена")
+    for table, report in status["history"]:
+        if "error" in report:
+            print(f'- {report["at"]} таблица "{table}": ошибка {report["error"]}')
+        else:
+            print(f"- {report['at']} {_vacuum_report(table, report)}")
+
+
+def _backup(target_dir: str) -> None:
+    report = backup_database(target_dir)
+    print(
+        f"Резервная копия создана: {report['snapshot']} "
+        f"(файлов {report['files']}: ссылок {report['linked']}, "
+        f"скопировано {report['copied']}, {report['copied_bytes']} байт) "
+        f"за {report['seconds']:.3f} секунд."
+    )
+
+
+def _restore(source_dir: str, name: str | None) -> None:
+    snapshot = resolve_snapshot(source_dir, name)
+    if snapshot is None:
+        print(f'Ошибка: Снимок в "{source_dir}" не найден.')
+        return
+    bad = verify_snapshot(snapshot)
+    if bad:
+        print(
+            f"Ошибка: Снимок {snapshot} повреждён "
+            f"(не совпали контрольные суммы: {', '.join(bad)})."
+        )
+        return
+    report = restore_database(snapshot)
+    if report is None:
+        return
+    print(
+        f"База восстановлена из {snapshot} "
+        f"(файлов {report['files']}) за {report['seconds']:.3f} секунд."
+    )
+
+
+def _table_stats(table: str) -> dict | None:
+    return load_metadata(STATS_FILE).get(table)
+
+
+def _mark_stats_stale(table: str) -> None:
+    """После записи в таблицу её статистика больше не гарантированно точна."""
+    stats = load_metadata(STATS_FILE)
+    if table in stats and not stats[table].get("stale"):
+        stats[table]["stale"] = True
+        save_metadata(STATS_FILE, stats)
+
+
+def _analyze(table: str, metadata: dict) -> None:
+    if table not in metadata:
+        print(f'Ошибка: Таблица "{table}" не существует.')
+        return
+    # один потоковый проход по таблице: в памяти только счётчики значений
+    table_stats = analyze_table(iter_table_rows(table), metadata[table])
+    stats = load_metadata(STATS_FILE)
+    stats[table] = table_stats
+    save_metadata(STATS_FILE, stats)
+    print(
+        f'Статистика таблицы "{table}" собрана: записей {table_stats["row_count"]}, '
+        f"столбцов {len(metadata[table])}."
+    )
+
+
+def _explain(text: str, metadata: dict) -> None:
+    plan = _get_plan(text, metadata)
+    if plan is None:
+        print(
+            "Некорректное значение: explain поддерживает только "
+            "insert/select/update/delete. Попробуйте снова."
+        )
+        return
+    if plan["op"] == "error":
+        print(plan["message"])
+        return
+
+    table = plan["table"]
+    print(f"Операция: {plan['op']}, таблица: {table}")
+    if plan["op"] == "insert":
+        print("Путь доступа: добавление записи в конец таблицы")
+        return
+
+    table_stats = _table_stats(table)
+    access = choose_access_path(plan["where"], table_stats)
+    print(f"Путь доступа: {PATH_TITLES[access['path']]}")
+    if access["estimated_rows"] is None:
+        print(f"Оценка строк: нет данных (выполните analyze {table})")
+    else:
+        print(
+            f"Оценка строк: {access['estimated_rows']} "
+            f"из {table_stats['row_count']}"
+        )
+        print(f"Стоимость (строк к чтению): {access['cost']}")
+    print(f"Статистика: {access['stats']}")
+
+    steps = []
+    if plan.get("group_by"):
+        steps.append(f"группировка по {plan['group_by']} (хэш-агрегирование)")
+    elif plan.get("distinct"):
+        steps.append("удаление повторов (хэширование)")
+    if plan.get("order_by"):
+        steps.append(f"сортировка по {plan['order_by'][0]} (внешняя сортировка)")
+    if steps:
+        print(f"Операции: {', '.join(steps)}")
+        print(
+            f"Бюджет памяти: {memory_budget() // 1024} КБ "
+            "(при превышении — выгрузка во временные файлы data/)"
+        )
+
+
+def _query_pipeline(rows, plan: dict):
+    """
+    group by / distinct / order by поверх потока записей. Пока данные
+    помещаются в бюджет памяти, всё делается в памяти, иначе —
+    с выгрузкой во временные файлы в data/ (см. external.py).
+    """
+    columns = plan["columns"]
+    if plan["group_by"]:
+        rows = group_count(rows, plan["group_by"], _COUNT)
+    elif plan["distinct"]:
+        rows = distinct_rows(_project_stream(rows, columns))
+    if plan["order_by"]:
+        column, descending = plan["order_by"]
+        rows = external_sort(rows, column, descending)
+    return _project_stream(rows, columns)
+
+
+def _project_stream(rows, columns):
+    if not columns:
+        return rows
+    return ({c: row[c] for c in columns if c in row} for row in rows)
+
+
+def _commit_changes(table: str, changed_rows: list[dict], removed_ids: set) -> None:
+    """
+    Записывает изменения таблицы: журнал, отметку об устаревшей статистике
+    и представления — под одной блокировкой записи, чтобы снимок (backup)
+    или другой процесс не увидели изменение записанным наполовину.
+    """
+    with table_write_lock():
+        append_table_log(table, changed_rows, removed_ids)
+        _mark_stats_stale(table)
+        refresh_views(table, changed_rows, removed_ids)
+
+
+def _execute_plan(plan: dict, metadata: dict) -> None:
+    """Выполняет план команды работы с данными."""
+    if plan["op"] == "error":
+        print(plan["message"])
+        return
+    if _count_params(plan):
+        print(
+            "Некорректное значение: параметр ? допустим только в prepare. "
+            "Попробуйте снова."
+        )
+        return
+
+    table = plan["table"]
+    if plan["op"] == "insert":
+        # новый ID (max + 1) выбирается под той же блокировкой, что и запись:
+        # иначе два процесса могут выдать один ID и вторая запись затрёт первую
+        with table_write_lock():
+            record = insert(metadata, table, plan["values"])
+            if record is None:
+                return
+            # в журнал дописывается только новая запись, файл не перезаписывается
+            _commit_changes(table, [record], set())
+        print(f'Запись с ID={record["ID"]} успешно добавлена в таблицу "{table}".')
+        return
+
+    # select/update/delete: путь доступа выбирает планировщик по статистике
+    access = choose_access_path(plan["where"], _table_stats(table))
+    skip = access["path"] == PATH_SKIP
+    unique = access["path"] == PATH_ID_LOOKUP
+
+    match plan["op"]:
+        case "select":
+            if skip:
+                _print_rows(table, metadata, [], plan["columns"])
+                return
+            # для представления читается только оно само, не базовая таблица;
+            # записи читаются потоком, в памяти остаются только подходящие
+            rows = filter_rows(
+                iter_table_rows(table, plan["load_columns"]), plan["where"], unique
+            )
+            if plan["distinct"] or plan["group_by"] or plan["order_by"]:
+                rows = _query_pipeline(rows, plan)
+            else:
+                rows = _project_stream(rows, plan["columns"])
+            # вывод тоже потоковый: таблица целиком в память не попадает
+            scan(
+                rows,
+                lambda out: _print_rows(
+                    plan["source"] or table, metadata, out, plan["columns"]
+                ),
+            )
+
+        case "update":
+            if skip:
+                print("Записи для обновления не найдены.")
+                return
+            # в память попадают только подходящие записи; после update
+            # это те же объекты, то есть уже их новые версии
+            touched = list(
+                filter_rows(iter_table_rows(table), plan["where"], unique)
+            )
+            new_data, changed = update(touched, plan["set"], plan["where"], unique)
+            if new_data is None:
+                return
+            if changed > 0:
+                _commit_changes(table, touched[:changed], set())
+                print(f"Обновлено записей: {changed}.")
+            else:
+                print("Записи для обновления не найдены.")
+
+        case "delete":
+            if skip:
+                print("Записи для удаления не найдены.")
+                return
+            data = list(filter_rows(iter_table_rows(table), plan["where"], unique))
+            before_len = len(data)
+            new_data = delete(data, plan["where"], unique)
+            if new_data is None:
+                return
+            removed = before_len - len(new_data)
+            if removed > 0:
+                kept_ids = {row.get("ID") for row in new_data}
+                removed_ids = {row.get("ID") for row in data} - kept_ids
+                _commit_changes(table, [], removed_ids)
+                print(f"Удалено записей: {removed}.")
+            else:
+                print("Записи для удаления не найдены.")
+
+
 def run():
     while True:
         metadata = load_metadata(META_FILE)
@@ -180,6 +1026,12 @@ def run():
         if not user_input:
             continue
 
+        # insert/select/update/delete: план берётся из кэша разобранных команд
+        plan = _get_plan(user_input, metadata)
+        if plan is not None:
+            _execute_plan(plan, metadata)
+            continue
+
         args = _split_args(user_input)
         if args is None:  # декоратор вернёт None, если был ValueError в shlex
             continue
@@ -189,6 +1041,7 @@ def run():
                 print_help()
 
             case ["exit"]:
+                stop_background_compaction()
                 break
 
             case ["list_tables"]:
@@ -202,8 +1055,34 @@ def run():
                 continue
 
             case ["create_table", table, *cols]:
+                cols, codec = _split_compression_option(cols)
+                if codec is not None and codec not in COMPRESSION_CODECS:
+                    print(
+                        f"Некорректное значение: compression={codec}. "
+                        "Попробуйте снова."
+                    )
+                    continue
+                if view_source(table) is not None:
+                    print(f'Ошибка: Представление "{table}" уже существует.')
+                    continue
+                existed = table in metadata
                 metadata = create_table(metadata, table, cols)
                 save_metadata(META_FILE, metadata)
+                if codec is not None and not existed and table in metadata:
+                    _set_compression(table, codec)
+                continue
+
+            # ALTER: alter table <table> set compression <codec>
+            case ["alter", "table", table, "set", "compression", codec]:
+                codec = codec.lower()
+                if table not in metadata:
+                    print(f'Ошибка: Таблица "{table}" не существует.')
+                    continue
+                if codec not in COMPRESSION_CODECS:
+                    print(f"Некорректное значение: {codec}. Попробуйте снова.")
+                    continue
+                _set_compression(table, codec)
+                print(f'Сжатие таблицы "{table}" изменено на {codec}.')
                 continue
 
             case ["drop_table"]:
@@ -216,139 +1095,91 @@ def run():
             case ["drop_table", table]:
                 metadata = drop_table(metadata, table)
                 save_metadata(META_FILE, metadata)
+                if table not in metadata:
+                    drop_views_of(table)
+                    for side_file in (STATS_FILE, OPTIONS_FILE):
+                        side = load_metadata(side_file)
+                        if side.pop(table, None) is not None:
+                            save_metadata(side_file, side)
                 continue
 
-            # INSERT: insert into <table> values (...)
-            case ["insert", "into", table, *rest]:
-                if not rest or rest[0].lower() != "values":
-                    print(
-                        "Некорректное значение: ожидается 'values (...)'. "
-                        "Попробуйте снова."
-                    )
-                    continue
-
-                start = user_input.find("(")
-                end = user_input.rfind(")")
-                if start == -1 or end == -1 or end < start:
-                    print(
-                        "Некорректное значение: отсутствует список значений в скобках. "
-                        "Попробуйте снова."
-                    )
-                    continue
-
-                inner = user_input[start + 1 : end]
-                values = _split_values_inner(inner)
+            # CREATE VIEW: create view <name> as select from <table> [where ...]
+            case ["create", "view", name, "as", "select", *_]:
+                idx = _find_keyword_outside_quotes(user_input, " as ")
+                _create_view(name, user_input[idx + len(" as ") :], metadata)
+                continue
 
-                before = load_table_data(table)
-                after = insert(metadata, table, values)
-                if after is None:
-                    continue
-                save_table_data(table, after)
+            # DROP VIEW: drop view <name>
+            case ["drop", "view", name]:
+                if drop_view(name):
+                    print(f'Представление "{name}" успешно удалено.')
+                else:
+                    print(f'Ошибка: Представление "{name}" не существует.')
+                continue
 
-                new_id = None
-                if len(after) > len(before):
-                    last = after[-1]
-                    if isinstance(last, dict) and "ID" in last:
-                        new_id = last["ID"]
+            # VACUUM: vacuum auto on [<КБ/с>] | vacuum auto off | vacuum status
+            case ["vacuum", "auto", "on", *budget]:
+                _start_auto_vacuum(budget)
+                continue
 
-                if new_id is not None:
-                    print(
-                        f'Запись с ID={new_id} успешно добавлена в таблицу "{table}".'
-                    )
+            case ["vacuum", "auto", "off"]:
+                if stop_background_compaction():
+                    print("Фоновая очистка остановлена.")
                 else:
-                    print(f'Запись успешно добавлена в таблицу "{table}".')
+                    print("Фоновая очистка не запущена.")
                 continue
 
-            # SELECT: select from <table> [where <col> = <value>]
-            case ["select", "from", table, "where", *_]:
-                # берём условие из исходной строки, чтобы не терять кавычки
-                cond_str = _extract_condition_after_where(user_input)
-                if not cond_str:
-                    print(
-                        "Некорректное значение: where. "
-                        "Ожидается формат: поле = значение (строки в кавычках)."
-                    )
-                    continue
-                where_clause = parse_where(cond_str)
-                if where_clause is None:
-                    print(
-                        "Некорректное значение: where. "
-                        "Ожидается формат: поле = значение (строки в кавычках)."
-                    )
-                    continue
+            case ["vacuum", "status"]:
+                _print_vacuum_status()
+                continue
 
-                data = load_table_data(table)
-                rows = select(data, where_clause)
-                _print_rows(table, metadata, rows)
+            # VACUUM: vacuum <table>
+            case ["vacuum", table]:
+                _vacuum(table, metadata)
                 continue
 
-            case ["select", "from", table]:
-                data = load_table_data(table)
-                rows = select(data, None)
-                _print_rows(table, metadata, rows)
+            # BACKUP: backup to <dir>
+            case ["backup", "to", target_dir]:
+                _backup(target_dir)
                 continue
 
-            # UPDATE: update <table> set <col>=<value> where <col>=<value>
-            case ["update", table, "set", *rest]:
-                # извлекаем set/where из исходной строки, сохраняя кавычки
-                clauses = _extract_update_clauses(user_input)
-                if clauses is None:
-                    print(
-                        "Некорректное значение: отсутствует корректная секция "
-                        "SET/WHERE. Попробуйте снова."
-                    )
-                    continue
-                set_str, where_str = clauses
+            # RESTORE: restore from <dir> [<snapshot>]
+            case ["restore", "from", source_dir, *name] if len(name) <= 1:
+                _restore(source_dir, name[0] if name else None)
+                continue
 
-                set_clause = parse_set(set_str)
-                where_clause = parse_where(where_str)
-                if set_clause is None or where_clause is None:
-                    print(
-                        "Некорректное значение: set/where. "
-                        "Ожидается формат: поле = значение (строки в кавычках)."
-                    )
-                    continue
+            # MEMORY BUDGET: set memory_budget [<КБ>]
+            case ["set", "memory_budget"]:
+                print(f"Бюджет памяти: {memory_budget() // 1024} КБ.")
+                continue
 
-                data = load_table_data(table)
-                new_data, changed = update(data, set_clause, where_clause)
-                if new_data is None:
+            case ["set", "memory_budget", size]:
+                if not size.isdigit() or int(size) == 0:
+                    print(f"Некорректное значение: {size}. Попробуйте снова.")
                     continue
-                save_table_data(table, new_data)
-                if changed > 0:
-                    print(f"Обновлено записей: {changed}.")
-                else:
-                    print("Записи для обновления не найдены.")
+                set_memory_budget(int(size) * 1024)
+                print(f"Бюджет памяти: {memory_budget() // 1024} КБ.")
                 continue
 
-            # DELETE: delete from <table> where <col>=<value>
-            case ["delete", "from", table, "where", *_]:
-                cond_str = _extract_condition_after_where(user_input)
-                if not cond_str:
-                    print(
-                        "Некорректное значение: where. "
-                        "Ожидается формат: поле = значение (строки в кавычках)."
-                    )
-                    continue
+            # ANALYZE: analyze <table>
+            case ["analyze", table]:
+                _analyze(table, metadata)
+                continue
 
-                where_clause = parse_where(cond_str)
-                if where_clause is None:
-                    print(
-                        "Некорректное значение: where. "
-                        "Ожидается формат: поле = значение (строки в кавычках)."
-                    )
-                    continue
+            # EXPLAIN: explain <command>
+            case ["explain", _, *_]:
+                _explain(user_input[len("explain ") :].strip(), metadata)
+                continue
 
-                data = load_table_data(table)
-                before_len = len(data)
-                new_data = delete(data, where_clause)
-                if new_data is None:
-                    continue
-                removed = before_len - len(new_data)
-                save_table_data(table, new_data)
-                if removed > 0:
-                    print(f"Удалено записей: {removed}.")
-                else:
-                    print("Записи для удаления не найдены.")
+            # PREPARE: prepare <name> as <command with ?>
+            case ["prepare", name, "as", *_]:
+                idx = _find_keyword_outside_quotes(user_input, " as ")
+                _prepare(name, user_input[idx + len(" as ") :].strip(), metadata)
+                continue
+
+            # EXECUTE: execute <name> [(<v1>, <v2>, ...)]
+            case ["execute", name, *_]:
+                _execute_prepared(name, user_input, metadata)
                 continue
 
             # INFO: info <table>
@@ -357,10 +1188,25 @@ def run():
                     print(f'Ошибка: Таблица "{table}" не существует.')
                     continue
                 cols_msg = ", ".join(metadata[table])
-                count = len(load_table_data(table))
+                # свежая статистика избавляет от чтения всей таблицы
+                table_stats = _table_stats(table)
+                if table_stats is not None and not table_stats.get("stale"):
+                    count = table_stats["row_count"]
+                    stats_state = "актуальна"
+                else:
+                    count = sum(1 for _ in iter_table_rows(table, ["ID"]))
+                    stats_state = "устарела" if table_stats else "отсутствует"
                 print(f"Таблица: {table}")
                 print(f"Столбцы: {cols_msg}")
                 print(f"Количество записей: {count}")
+                print(f"Статистика: {stats_state}")
+                storage = table_storage_info(table)
+                print(f"Сжатие: {storage['compression']}")
+                print(
+                    f"Размер: исходный {storage['raw_size']} байт, "
+                    f"на диске {storage['disk_size']} байт"
+                )
+                print(f"Журнал изменений: {table_log_size(table)} байт")
                 continue
 
             # нераспознанная команда
@@ -0,0 +1,198 @@
+# src/primitive_db/external.py
+
+import heapq
+import json
+import os
+import sys
+
+from .constants import MEMORY_BUDGET, SPILL_PARTITIONS
+from .utils import data_dir
+
+# бюджет памяти движка, байт; PRIMITIVE_DB_MEMORY_BUDGET переопределяет значение
+_budget = {"bytes": int(os.environ.get("PRIMITIVE_DB_MEMORY_BUDGET", MEMORY_BUDGET))}
+
+
+def memory_budget() -> int:
+    return _budget["bytes"]
+
+
+def set_memory_budget(size: int) -> None:
+    if size <= 0:
+        raise ValueError("бюджет памяти должен быть больше нуля")
+    _budget["bytes"] = size
+
+
+def row_size(row: dict) -> int:
+    """Приблизительный объём записи в памяти, байт."""
+    return sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+
+
+def _spill_file():
+    # tempfile (а с ним shutil, random, zlib, lzma) импортируется при первой
+    # выгрузке, а не при старте CLI
+    import tempfile
+
+    # временные файлы — рядом с таблицами, в data/
+    fd, path = tempfile.mkstemp(prefix="spill_", suffix=".tmp", dir=data_dir())
+    return os.fdopen(fd, "w+", encoding="utf-8"), path
+
+
+def _write_rows(f, rows) -> None:
+    for row in rows:
+        f.write(json.dumps(row, ensure_ascii=False))
+        f.write("\n")
+
+
+def _read_rows(f):
+    f.seek(0)
+    for line in f:
+        yield json.loads(line)
+
+
+def _sort_key(column: str, descending: bool = False):
+    # записи без столбца — в конце при любом направлении (при reverse=True
+    # признак отсутствия инвертируется); значения одного столбца однотипны
+    def key(row: dict):
+        value = row.get(column)
+        missing = value is None
+        return (missing != descending, 0 if missing else value)
+    return key
+
+
+def external_sort(rows, column: str, descending: bool = False):
+    """
+    Сортирует поток записей по столбцу. Пока записи помещаются в бюджет
+    памяти — обычная сортировка; иначе отсортированные серии сбрасываются
+    во временные файлы и сливаются (внешняя сортировка слиянием).
+    """
+    key = _sort_key(column, descending)
+    budget = memory_budget()
+    run: list[dict] = []
+    used = 0
+    spills = []
+
+    try:
+        for row in rows:
+            run.append(row)
+            used += row_size(row)
+            if used > budget:
+                run.sort(key=key, reverse=descending)
+                f, path = _spill_file()
+                _write_rows(f, run)
+                spills.append((f, path))
+                run, used = [], 0
+
+        run.sort(key=key, reverse=descending)
+        if not spills:
+            yield from run
+            return
+
+        streams = [_read_rows(f) for f, _ in spills]
+        streams.append(iter(run))
+        yield from heapq.merge(*streams, key=key, reverse=descending)
+    finally:
+        _cleanup(spills)
+
+
+def _cleanup(spills) -> None:
+    for f, path in spills:
+        f.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _fingerprint(row: dict) -> str:
+    return json.dumps(row, ensure_ascii=False, sort_keys=True)
+
+
+def _partition(key: str) -> int:
+    return hash(key) % SPILL_PARTITIONS
+
+
+def distinct_rows(rows):
+    """
+    Убирает повторяющиеся записи. Отпечатки уже выданных записей хранятся
+    в памяти, пока хватает бюджета; затем оставшийся поток и отпечатки
+    раскладываются по хэшу во временные разделы, и каждый раздел
+    обрабатывается отдельно (секционированное хэширование).
+    """
+    budget = memory_budget()
+    seen: set[str] = set()
+    used = 0
+    partitions = []
+    rows = iter(rows)
+
+    try:
+        for row in rows:
+            fp = _fingerprint(row)
+            if fp in seen:
+                continue
+            seen.add(fp)
+            used += sys.getsizeof(fp)
+            yield row
+            if used > budget:
+                break
+        else:
+            return
+
+        # бюджет исчерпан: раскладываем уже выданные отпечатки и остаток потока
+        partitions = [_spill_file() for _ in range(SPILL_PARTITIONS)]
+        for fp in seen:
+            partitions[_partition(fp)][0].write(json.dumps({"seen": fp}) + "\n")
+        seen.clear()
+        for row in rows:
+            fp = _fingerprint(row)
+            partitions[_partition(fp)][0].write(
+                json.dumps({"row": row, "fp": fp}, ensure_ascii=False) + "\n"
+            )
+
+        for f, _ in partitions:
+            part_seen = set()
+            for entry in _read_rows(f):
+                if "seen" in entry:
+                    part_seen.add(entry["seen"])
+                elif entry["fp"] not in part_seen:
+                    part_seen.add(entry["fp"])
+                    yield entry["row"]
+    finally:
+        _cleanup(partitions)
+
+
+def group_count(rows, column: str, count_name: str):
+    """
+    Считает записи по значениям столбца (group by ... count).
+    Группы, появившиеся после исчерпания бюджета памяти, не попадают
+    в словарь в памяти: их записи раскладываются по хэшу во временные
+    разделы и досчитываются по одному разделу (гибридное хэш-агрегирование).
+    """
+    budget = memory_budget()
+    counts: dict = {}
+    used = 0
+    partitions = []
+
+    try:
+        for row in rows:
+            value = row.get(column)
+            if value in counts:
+                counts[value] += 1
+            elif used <= budget:
+                counts[value] = 1
+                used += sys.getsizeof(value) + 64
+            else:
+                if not partitions:
+                    partitions = [_spill_file() for _ in range(SPILL_PARTITIONS)]
+                f = partitions[_partition(json.dumps(value))][0]
+                f.write(json.dumps(value, ensure_ascii=False) + "\n")
+
+        for value, count in counts.items():
+            yield {column: value, count_name: count}
+        counts.clear()
+
+        for f, _ in partitions:
+            part_counts: dict = {}
+            for value in _read_rows(f):
+                part_counts[value] = part_counts.get(value, 0) + 1
+            for value, count in part_counts.items():
+                yield {column: value, count_name: count}
+    finally:
+        _cleanup(partitions)
@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 
 
-from .engine import run
-
-
 def main():
     print("***База данных***\n")
 
     print("Функции (управление таблицами):")
-    print("<command> create_table <имя_таблицы> <столбец1:тип> .. - создать таблицу")
+    print(
+        "<command> create_table <имя_таблицы> <столбец1:тип> .. [compression=<кодек>]"
+        " - создать таблицу"
+    )
+    print(
+        "<command> alter table <имя_таблицы> set compression <кодек>"
+        " - сменить сжатие таблицы"
+    )
     print("<command> list_tables - показать список всех таблиц")
     print("<command> drop_table <имя_таблицы> - удалить таблицу")
     print()
@@ -19,10 +23,19 @@ def main():
         " - создать запись."
     )
     print("<command> select from <имя_таблицы> - прочитать все записи.")
+    print(
+        "<command> select <столбец1>, <столбец2> from <имя_таблицы>"
+        " - прочитать только указанные столбцы."
+    )
     print(
         "<command> select from <имя_таблицы> where <столбец> = <значение>"
         " - прочитать записи по условию."
     )
+    print(
+        "<command> select [distinct] ... [group by <столбец>]"
+        " [order by <столбец> [asc|desc]] - без повторов, по группам, с сортировкой."
+    )
+    print("<command> set memory_budget [<КБ>] - бюджет памяти движка.")
     print(
         "<command> update <имя_таблицы> set <столбец> = <значение>"
         " where <столбец_условия> = <значение_условия>"
@@ -33,12 +46,46 @@ def main():
         " - удалить запись."
     )
     print("<command> info <имя_таблицы> - вывести информацию о таблице.")
+    print(
+        "<command> create view <имя> as select from <имя_таблицы> [where ...]"
+        " - создать материализованное представление."
+    )
+    print("<command> drop view <имя> - удалить представление.")
+    print(
+        "<command> vacuum <имя_таблицы>"
+        " - слить журнал изменений с таблицей и освободить место."
+    )
+    print(
+        "<command> vacuum auto on [<КБ/с>] | vacuum auto off | vacuum status"
+        " - фоновая очистка."
+    )
+    print("<command> backup to <каталог> - создать снимок базы (инкрементальный).")
+    print(
+        "<command> restore from <каталог> [<снимок>]"
+        " - восстановить базу из снимка (по умолчанию последнего)."
+    )
+    print(
+        "<command> analyze <имя_таблицы>"
+        " - собрать статистику по столбцам таблицы."
+    )
+    print("<command> explain <команда> - показать план выполнения команды.")
+    print(
+        "<command> prepare <имя> as <команда с ? вместо значений>"
+        " - подготовить выражение."
+    )
+    print(
+        "<command> execute <имя> (<значение1>, <значение2>, ...)"
+        " - выполнить подготовленное выражение."
+    )
     print()
 
     print("Общие команды:")
     print("<command> help - справочная информация")
     print("<command> exit - выход из программы\n")
 
+    # движок импортируется после вывода приветствия: меньше задержка старта
+    from .engine import run
+
     run()
 
 
@@ -1,40 +1,83 @@
+class _Placeholder:
+    """Параметр '?' подготовленного выражения (prepare ... / execute ...)."""
 
+    def __repr__(self) -> str:
+        return "?"
 
 
-def parse_condition_strict(s: str):
-    # ожидаем ровно: <col> = <value>, где строковые значения в кавычках
-    s = s.strip()
-    parts = s.split("=")
+PARAM = _Placeholder()
 
-    match len(parts):
-        case 2:
-            key = parts[0].strip()
-            raw = parts[1].strip()
-        case _:
-            return None
+
+def parse_value(raw: str):
+    """
+    Литерал значения: строка в кавычках, true/false, целое число
+    или '?' (параметр). Некорректное значение -> None.
+    """
+    raw = raw.strip()
 
     # строка в кавычках?
     if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in ('"', "'"):
-        return {key: raw[1:-1]}
+        return raw[1:-1]
 
-    # bool / int / ошибка
+    # bool / int / параметр / ошибка
     low = raw.lower()
     match low:
         case "true":
-            return {key: True}
+            return True
         case "false":
-            return {key: False}
+            return False
+        case "?":
+            return PARAM
         case _:
             try:
-                return {key: int(raw)}
+                return int(raw)
             except ValueError:
                 # по правилу: строки должны быть в кавычках
                 return None
 
 
+def parse_condition_strict(s: str):
+    # ожидаем ровно: <col> = <value>, где строковые значения в кавычках
+    s = s.strip()
+    parts = s.split("=")
+
+    match len(parts):
+        case 2:
+            key = parts[0].strip()
+            raw = parts[1].strip()
+        case _:
+            return None
+
+    value = parse_value(raw)
+    if value is None:
+        return None
+    return {key: value}
+
+
 def parse_where(where_str: str):
     return parse_condition_strict(where_str)
 
 
 def parse_set(set_str: str):
     return parse_condition_strict(set_str)
+
+
+def parse_projection(cols_str: str):
+    """
+    Разбирает список столбцов SELECT: '*' -> [] (все столбцы),
+    'name, age' -> ['name', 'age']. Пустой или битый список -> None.
+    """
+    s = cols_str.strip()
+    if s == "*":
+        return []
+    if not s:
+        return None
+
+    columns = []
+    for part in s.split(","):
+        name = part.strip()
+        if not name or " " in name:
+            return None
+        if name not in columns:
+            columns.append(name)
+    return columns
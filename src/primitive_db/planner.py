@@ -0,0 +1,187 @@
+# src/primitive_db/planner.py
+
+from collections import Counter
+
+MCV_LIMIT = 10
+HISTOGRAM_BUCKETS = 10
+
+# пути доступа к данным
+PATH_FULL_SCAN = "full_scan"
+PATH_ID_LOOKUP = "id_lookup"
+PATH_SKIP = "skip"
+
+PATH_TITLES = {
+    PATH_FULL_SCAN: "полный просмотр таблицы (full scan)",
+    PATH_ID_LOOKUP: "поиск по уникальному столбцу с остановкой на первом "
+    "совпадении (id lookup)",
+    PATH_SKIP: "пропуск чтения таблицы: по статистике записей нет (skip)",
+}
+
+
+def analyze_table(rows, columns: list[str]) -> dict:
+    """
+    Считает статистику таблицы по схеме columns (["ID:int", "name:str", ...]):
+    число строк и для каждого столбца — distinct, null, min/max,
+    самые частые значения (mcv) и равноглубинную гистограмму для int.
+    rows читаются одним проходом и могут быть потоком: в памяти держатся
+    только счётчики различных значений.
+    """
+    schema = [entry.split(":", 1) for entry in columns]
+    counters = {name: Counter() for name, _ in schema}
+    nulls = dict.fromkeys(counters, 0)
+    total = 0
+    for row in rows:
+        total += 1
+        for name, counts in counters.items():
+            value = row.get(name)
+            if value is None:
+                nulls[name] += 1
+            else:
+                counts[value] += 1
+
+    col_stats = {}
+    for name, typ in schema:
+        counts = counters[name]
+        stats = {
+            "type": typ,
+            "distinct": len(counts),
+            "nulls": nulls[name],
+            "min": min(counts) if counts else None,
+            "max": max(counts) if counts else None,
+            "mcv": [[v, c] for v, c in counts.most_common(MCV_LIMIT)],
+        }
+        if typ == "int" and counts:
+            stats["histogram"] = _histogram(sorted(counts.items()))
+        col_stats[name] = stats
+
+    return {"row_count": total, "stale": False, "columns": col_stats}
+
+
+def _histogram(sorted_counts: list[tuple[int, int]]) -> list[int]:
+    # границы корзин с примерно равным числом значений в каждой;
+    # sorted_counts — пары (значение, сколько раз встречается) по возрастанию
+    n = sum(c for _, c in sorted_counts)
+    buckets = min(HISTOGRAM_BUCKETS, n)
+    targets = [min(n - 1, (i * n) // buckets) for i in range(buckets + 1)]
+
+    bounds = []
+    seen = 0
+    it = iter(sorted_counts)
+    value, count = next(it)
+    for target in targets:
+        while seen + count <= target:
+            seen += count
+            value, count = next(it)
+        bounds.append(value)
+    return bounds
+
+
+def estimate_rows(table_stats: dict, where_clause: dict | None) -> float:
+    """Оценка числа строк, подходящих под условие <col> = <value>."""
+    total = table_stats["row_count"]
+    if not where_clause:
+        return total
+
+    estimate = float(total)
+    for col, value in where_clause.items():
+        col_stats = table_stats["columns"].get(col)
+        if col_stats is None:
+            return 0.0
+        estimate = min(estimate, _estimate_eq(total, col_stats, value))
+    return estimate
+
+
+def _estimate_eq(total: int, col_stats: dict, value) -> float:
+    if total == 0 or col_stats["distinct"] == 0:
+        return 0.0
+    if not isinstance(value, (str, int)):
+        # параметр prepare: значение неизвестно — средняя селективность
+        return (total - col_stats["nulls"]) / col_stats["distinct"]
+    if not _type_matches(col_stats["type"], value):
+        return 0.0
+
+    if col_stats["type"] == "int" and (
+        value < col_stats["min"] or value > col_stats["max"]
+    ):
+        return 0.0
+
+    mcv = col_stats["mcv"]
+    for v, count in mcv:
+        if v == value:
+            return float(count)
+
+    # mcv покрывает все значения столбца — значения точно нет
+    rest_distinct = col_stats["distinct"] - len(mcv)
+    if rest_distinct <= 0:
+        return 0.0
+    rest_rows = total - col_stats["nulls"] - sum(c for _, c in mcv)
+    return max(rest_rows, 0) / rest_distinct
+
+
+def _type_matches(typ: str, value) -> bool:
+    # сравнение в core — обычное ==, поэтому True == 1 для int/bool столбцов
+    if typ == "str":
+        return isinstance(value, str)
+    return isinstance(value, int)
+
+
+def _is_unique(col: str, table_stats: dict | None) -> bool:
+    # ID уникален по построению: insert генерирует max + 1, а update
+    # менять ID не может (engine отклоняет такие команды);
+    # прочие столбцы — только по свежей статистике
+    if col == "ID":
+        return True
+    if not table_stats or table_stats.get("stale"):
+        return False
+    col_stats = table_stats["columns"].get(col)
+    return (
+        col_stats is not None
+        and col_stats["nulls"] == 0
+        and col_stats["distinct"] == table_stats["row_count"]
+    )
+
+
+def choose_access_path(where_clause: dict | None, table_stats: dict | None) -> dict:
+    """
+    Выбирает путь доступа для select/update/delete по стоимости
+    (стоимость = ожидаемое число прочитанных строк).
+    Возвращает {"path", "estimated_rows", "cost", "stats"}.
+    """
+    if table_stats is None:
+        stats_state = "отсутствует"
+    elif table_stats.get("stale"):
+        stats_state = "устарела"
+    else:
+        stats_state = "актуальна"
+
+    if table_stats is None:
+        # без статистики стоимость не оценить — просматриваем всё
+        path = PATH_FULL_SCAN
+        if where_clause and any(_is_unique(c, None) for c in where_clause):
+            path = PATH_ID_LOOKUP
+        return {
+            "path": path,
+            "estimated_rows": None,
+            "cost": None,
+            "stats": stats_state,
+        }
+
+    total = table_stats["row_count"]
+    estimated = estimate_rows(table_stats, where_clause)
+    candidates = {PATH_FULL_SCAN: float(total)}
+
+    if where_clause and any(_is_unique(c, table_stats) for c in where_clause):
+        # в среднем совпадение находится на середине таблицы
+        candidates[PATH_ID_LOOKUP] = total / 2
+
+    # пропуск допустим, только если статистика гарантированно верна
+    if where_clause and not table_stats.get("stale") and estimated == 0:
+        candidates[PATH_SKIP] = 0.0
+
+    path = min(candidates, key=candidates.get)
+    return {
+        "path": path,
+        "estimated_rows": round(estimated, 1),
+        "cost": round(candidates[path], 1),
+        "stats": stats_state,
+    }
@@ -1,45 +1,596 @@
 # src/primitive_db/utils.py
+import contextlib
+import copy
 import json
 import os
+import threading
+import time
 
-from .constants import DATA_DIR, META_FILE
+try:  # межпроцессная блокировка есть только на POSIX
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from .constants import (
+    DATA_DIR,
+    META_FILE,
+    OPTIONS_FILE,
+    STATS_FILE,
+    VIEWS_FILE,
+)
+
+# файлы таблиц в data/: основной (JSON или сжатый) и журнал изменений
+TABLE_FILE_SUFFIXES = (".json", ".tbl", ".log")
+
+_WRITE_CHUNK = 64 * 1024
+
+# запись в файлы таблиц: фоновая компакция vs команды (и другие процессы)
+_write_lock = threading.RLock()
+_write_lock_depth = 0
+
+# base_dir -> путь к data/ (каталог уже создан)
+_data_dirs: dict[str, str] = {}
+
+# путь к json-файлу метаданных -> (отпечаток stat, разобранные данные)
+_metadata_cache: dict[str, tuple[tuple, object]] = {}
 
 
 def _data_dir():
     base_dir = os.path.dirname(os.path.abspath(META_FILE))
-    data_dir = os.path.join(base_dir, DATA_DIR)
-    if not os.path.isdir(data_dir):
+    data_dir = _data_dirs.get(base_dir)
+    if data_dir is None:
+        data_dir = os.path.join(base_dir, DATA_DIR)
         os.makedirs(data_dir, exist_ok=True)
+        _data_dirs[base_dir] = data_dir
     return data_dir
 
 
+def data_dir() -> str:
+    """Каталог data/ рядом с файлом метаданных (создаётся при первом обращении)."""
+    return _data_dir()
+
+
 def _table_path(table_name: str) -> str:
     return os.path.join(_data_dir(), f"{table_name}.json")
 
 
-def load_metadata(filepath: str = META_FILE):
+def _compressed_table_path(table_name: str) -> str:
+    return os.path.join(_data_dir(), f"{table_name}.tbl")
+
+
+def _log_path(table_name: str) -> str:
+    return os.path.join(_data_dir(), f"{table_name}.log")
+
+
+@contextlib.contextmanager
+def table_write_lock():
+    """
+    Блокировка записи в файлы таблиц: между потоками и между процессами.
+    Повторный вход в том же потоке допускается.
+    """
+    global _write_lock_depth
+    with _write_lock:
+        _write_lock_depth += 1
+        try:
+            if fcntl is None or _write_lock_depth > 1:
+                yield
+                return
+            with open(os.path.join(_data_dir(), ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            _write_lock_depth -= 1
+
+
+def _write_file(path: str, payload: bytes, io_budget: int | None = None) -> None:
+    """
+    Атомарная запись: пишем во временный файл и подменяем им path,
+    поэтому читатели всегда видят либо старую, либо новую версию.
+    io_budget — ограничение скорости записи, байт/с (None — без ограничения).
+    """
+    _write_stream(path, [payload], io_budget)
+
+
+def _write_stream(
+    path: str,
+    chunks,
+    io_budget: int | None = None,
+    stop: threading.Event | None = None,
+) -> bool:
+    """
+    Как _write_file, но содержимое приходит кусками (например, потоком записей).
+    stop прерывает запись между кусками (и ожидание из-за io_budget):
+    временный файл удаляется, path не меняется, возвращается False.
+    """
+    tmp = f"{path}.tmp{os.getpid()}"
+    t0 = time.monotonic()
+    written = 0
+    buf = bytearray()
+
+    def flush(final: bool = False) -> bool:
+        nonlocal written, buf
+        while len(buf) >= _WRITE_CHUNK or (final and buf):
+            piece = bytes(buf[:_WRITE_CHUNK])
+            del buf[:_WRITE_CHUNK]
+            f.write(piece)
+            written += len(piece)
+            if stop is not None and stop.is_set():
+                return False
+            if io_budget:
+                ahead = written / io_budget - (time.monotonic() - t0)
+                if ahead > 0:
+                    if stop is None:
+                        time.sleep(ahead)
+                    elif stop.wait(ahead):
+                        return False
+        return True
+
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(tmp, "wb") as f:
+            done = True
+            for chunk in chunks:
+                buf += chunk
+                if not flush():
+                    done = False
+                    break
+            done = done and flush(final=True)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if not done:
+        os.remove(tmp)
+        return False
+    os.replace(tmp, path)
+    return True
+
+
+def table_compression(table_name: str) -> str:
+    """Кодек таблицы из db_options.json ("none", если не задан)."""
+    options = load_metadata(OPTIONS_FILE).get(table_name, {})
+    return options.get("compression", "none")
+
+
+def _stat_key(filepath: str) -> tuple | None:
+    try:
+        st = os.stat(filepath)
     except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def load_metadata(filepath: str = META_FILE):
+    """
+    Читает json-файл метаданных. Файл разбирается заново, только если
+    изменились его mtime/размер (например, его записал другой процесс);
+    иначе возвращается копия закэшированных данных.
+    """
+    key = os.path.abspath(filepath)
+    stat_key = _stat_key(filepath)
+    if stat_key is None:
+        _metadata_cache.pop(key, None)
         return {}
 
+    cached = _metadata_cache.get(key)
+    if cached is not None and cached[0] == stat_key:
+        return copy.deepcopy(cached[1])
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    _metadata_cache[key] = (stat_key, data)
+    return copy.deepcopy(data)
+
 
 def save_metadata(filepath: str, data):
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # атомарно и под блокировкой записи: снимок (backup) видит файл целиком
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    with table_write_lock():
+        _write_file(filepath, text.encode("utf-8"))
+    _metadata_cache[os.path.abspath(filepath)] = (
+        _stat_key(filepath),
+        copy.deepcopy(data),
+    )
 
 
-def load_table_data(table_name: str):
-    path = _table_path(table_name)
+def load_table_data(table_name: str, columns: list[str] | None = None):
+    """
+    Загружает записи таблицы (сжатые таблицы распаковываются прозрачно)
+    и применяет поверх них журнал изменений <таблица>.log.
+    Если передан columns — в записях остаются только эти столбцы
+    (проекция выполняется на уровне хранения, до передачи в core/вывод).
+    """
+    return list(iter_table_rows(table_name, columns))
+
+
+def iter_table_rows(table_name: str, columns: list[str] | None = None):
+    """
+    Как load_table_data, но отдаёт записи по одной, читая основной JSON-файл
+    потоково: в памяти не держится вся таблица. Сжатая (столбцовая) таблица
+    распаковывается целиком — иначе строки из столбцов не собрать.
+    """
+    yield from _iter_open_rows(*_open_table_files(table_name), columns)
+
+
+def _open_table_files(table_name: str):
+    """
+    Открывает основной файл и журнал таблицы под блокировкой (это быстро),
+    читать их можно уже без неё: оба из одного согласованного состояния.
+    Возвращает (основной файл или None, журнал или None, длина журнала).
+    """
+    with table_write_lock():
+        base = _open_if_exists(_compressed_table_path(table_name), "rb")
+        if base is None:
+            base = _open_if_exists(_table_path(table_name), "r")
+        log = _open_if_exists(_log_path(table_name), "rb")
+        log_size = os.fstat(log.fileno()).st_size if log is not None else 0
+    return base, log, log_size
+
+
+def _iter_open_rows(base, log, log_size: int, columns: list[str] | None = None):
+    """
+    Записи из файлов, открытых _open_table_files: журнал читается только
+    до длины log_size, дописанное позже в этот проход не попадает.
+    """
+    log_state = {}
+    if log is not None:
+        with log:
+            log_state = _read_log(log, log_size)
+
+    # ID нужен для наложения журнала, даже если его нет в проекции
+    read_columns = columns
+    if columns is not None and "ID" not in columns:
+        read_columns = [*columns, "ID"]
+
+    if base is None:
+        base_rows = iter(())
+    elif "b" in base.mode:
+        from .compression import decode_table
+
+        with base:
+            base_rows = iter(decode_table(base.read(), read_columns))
+    else:
+        base_rows = _iter_json_array(base)
+
+    try:
+        yield from _merge_log(base_rows, log_state, columns)
+    finally:
+        if base is not None:
+            base.close()
+
+
+def _open_if_exists(path: str, mode: str):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        if "b" in mode:
+            return open(path, mode)
+        return open(path, mode, encoding="utf-8")
     except FileNotFoundError:
-        return []
+        return None
+
+
+def _iter_json_array(f):
+    """Потоково разбирает JSON-массив объектов из файла f, кусками."""
+    decoder = json.JSONDecoder()
+    buf = f.read(_WRITE_CHUNK).lstrip()
+    if not buf:
+        return
+    if buf[0] != "[":
+        raise ValueError("повреждён файл таблицы (ожидается JSON-массив)")
+    pos = 1
+    eof = False
+
+    while True:
+        # пропускаем пробелы и запятые между объектами
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(_WRITE_CHUNK)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        yield obj
+        pos = end
+        if pos > _WRITE_CHUNK:
+            buf = buf[pos:]
+            pos = 0
+
+
+def _read_log(f, limit: int | None = None) -> dict:
+    """
+    Итог журнала по каждому ID: {"row": последняя версия или None (удалена),
+    "reborn": удалена и вставлена заново, "order": когда вставлена в конец}.
+    Строки журнала: {"put": запись} — вставка/новая версия, {"del": ID}.
+    f открыт в двоичном режиме; limit — сколько байт журнала учитывать.
+    """
+    state: dict = {}
+    pos = 0
+    for order, line in enumerate(f):
+        pos += len(line)
+        if limit is not None and pos > limit:
+            break
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # недописанная строка (прерванная запись) — пропускаем
+            continue
+        if "put" in entry:
+            row = entry["put"]
+            st = state.get(row.get("ID"))
+            if st is None:
+                state[row.get("ID")] = {"row": row, "reborn": False, "order": order}
+            else:
+                if st["row"] is None:
+                    st["reborn"] = True
+                    st["order"] = order
+                st["row"] = row
+        elif "del" in entry:
+            st = state.setdefault(
+                entry["del"], {"row": None, "reborn": False, "order": order}
+            )
+            st["row"] = None
+    return state
+
+
+def _merge_log(base_rows, log_state: dict, columns):
+    # записи основного файла — на своих местах (или их новые версии из журнала),
+    # новые и вставленные заново после удаления — в конце, в порядке журнала
+    seen = set()
+    for row in base_rows:
+        row_id = row.get("ID")
+        st = log_state.get(row_id)
+        if st is None:
+            yield _project(row, columns)
+            continue
+        seen.add(row_id)
+        if st["row"] is not None and not st["reborn"]:
+            yield _project(st["row"], columns)
+
+    tail = [
+        (st["order"], st["row"])
+        for row_id, st in log_state.items()
+        if st["row"] is not None and (st["reborn"] or row_id not in seen)
+    ]
+    tail.sort(key=lambda item: item[0])
+    for _, row in tail:
+        yield _project(row, columns)
+
+
+def _project(row: dict, columns) -> dict:
+    if columns is None:
+        return row
+    return {c: row[c] for c in columns if c in row}
+
+
+def append_table_log(
+    table_name: str, changed_rows: list[dict], removed_ids=()
+) -> None:
+    """
+    Дописывает изменения в журнал таблицы вместо перезаписи всего файла.
+    Журнал сливается с основным файлом командой vacuum или фоновой компакцией.
+    """
+    lines = []
+    for row_id in removed_ids:
+        lines.append(json.dumps({"del": row_id}, ensure_ascii=False))
+    for row in changed_rows:
+        lines.append(json.dumps({"put": row}, ensure_ascii=False))
+    if not lines:
+        return
+    with table_write_lock():
+        with open(_log_path(table_name), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def _json_rows_chunks(rows):
+    """JSON-массив по записи в строке: так его можно и писать, и читать потоком."""
+    yield b"["
+    sep = b"\n"
+    for row in rows:
+        yield sep + json.dumps(row, ensure_ascii=False).encode("utf-8")
+        sep = b",\n"
+    yield b"\n]\n"
+
+
+def _encode_table_file(table_name: str, rows):
+    """
+    (путь, содержимое кусками, путь файла в другом формате) по кодеку таблицы.
+    Без сжатия записи кодируются потоком; столбцовому формату нужны
+    все записи сразу, поэтому для сжатых таблиц они собираются в список.
+    """
+    codec = table_compression(table_name)
+
+    if codec == "none":
+        return (
+            _table_path(table_name),
+            _json_rows_chunks(rows),
+            _compressed_table_path(table_name),
+        )
+
+    from .compression import encode_table
+
+    rows = list(rows)
+    raw_size = sum(len(chunk) for chunk in _json_rows_chunks(rows))
+    return (
+        _compressed_table_path(table_name),
+        [encode_table(rows, codec, raw_size)],
+        _table_path(table_name),
+    )
 
 
 def save_table_data(table_name: str, data):
+    """
+    Сохраняет записи целиком в формате, заданном опцией compression таблицы.
+    Журнал изменений после этого не нужен — он удаляется.
+    """
+    path, chunks, stale = _encode_table_file(table_name, data)
+    with table_write_lock():
+        _write_stream(path, chunks)
+        # файл в прежнем формате и журнал больше не нужны
+        for old in (stale, _log_path(table_name)):
+            if os.path.exists(old):
+                os.remove(old)
+
+
+def table_disk_size(table_name: str) -> int:
+    """Сколько байт таблица занимает на диске (основной файл + журнал)."""
+    total = 0
+    for path in (
+        _table_path(table_name),
+        _compressed_table_path(table_name),
+        _log_path(table_name),
+    ):
+        if os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+
+def compact_table_data(
+    table_name: str,
+    io_budget: int | None = None,
+    stop: threading.Event | None = None,
+) -> dict | None:
+    """
+    Сливает журнал с основным файлом таблицы, не блокируя чтение и запись:
+    под блокировкой файлы только открываются, читаются и пишутся потоком
+    без неё (с ограничением скорости io_budget), подмена — снова под
+    блокировкой. Изменения, дописанные в журнал тем временем, сохраняются.
+    Возвращает {"before", "after", "reclaimed", "seconds"} или None,
+    если таблицу за это время перезаписали целиком или компакцию прервал
+    stop (повторить позже).
+    """
+    t0 = time.monotonic()
+    log_path = _log_path(table_name)
+
+    with table_write_lock():
+        before = table_disk_size(table_name)
+        base_key = (
+            _stat_key(_table_path(table_name)),
+            _stat_key(_compressed_table_path(table_name)),
+        )
+        base, log, log_offset = _open_table_files(table_name)
+
+    if log is None:
+        # сливать нечего: основной файл уже в итоговом виде
+        if base is not None:
+            base.close()
+        return {
+            "before": before,
+            "after": before,
+            "reclaimed": 0,
+            "seconds": time.monotonic() - t0,
+        }
+
+    rows = _iter_open_rows(base, log, log_offset)
+    path, chunks, stale = _encode_table_file(table_name, rows)
+    tmp = f"{path}.compact"
+    try:
+        written = _write_stream(tmp, chunks, io_budget, stop)
+    finally:
+        rows.close()
+        if base is not None:
+            base.close()
+    if not written:
+        return None
+
+    with table_write_lock():
+        current_key = (
+            _stat_key(_table_path(table_name)),
+            _stat_key(_compressed_table_path(table_name)),
+        )
+        if current_key != base_key:
+            os.remove(tmp)
+            return None
+        os.replace(tmp, path)
+        if os.path.exists(stale):
+            os.remove(stale)
+
+        # хвост журнала, дописанный после снимка, переносим в новый журнал
+        tail = b""
+        if os.path.exists(log_path):
+            with open(log_path, "rb") as f:
+                f.seek(log_offset)
+                tail = f.read()
+        if tail:
+            _write_file(log_path, tail)
+        elif os.path.exists(log_path):
+            os.remove(log_path)
+        after = table_disk_size(table_name)
+
+    # дописанное во время компакции в освобождённое место не засчитываем
+    return {
+        "before": before,
+        "after": after,
+        "reclaimed": before - (after - len(tail)),
+        "seconds": time.monotonic() - t0,
+    }
+
+
+def remove_table_data(table_name: str) -> None:
+    """Удаляет файлы данных таблицы (в любом формате и журнал), если они есть."""
+    for path in (
+        _table_path(table_name),
+        _compressed_table_path(table_name),
+        _log_path(table_name),
+    ):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def table_storage_info(table_name: str) -> dict:
+    """
+    Размеры основного файла таблицы без загрузки записей: исходный (как JSON,
+    по записи в строке) и на диске. Для сжатых таблиц исходный размер хранится
+    в заголовке. Журнал изменений сюда не входит (см. table_log_size).
+    """
+    compressed = _compressed_table_path(table_name)
+    if os.path.exists(compressed):
+        from .compression import read_file_header
+
+        with open(compressed, "rb") as f:
+            codec, header = read_file_header(f)
+        return {
+            "compression": codec,
+            "raw_size": header["raw_size"],
+            "disk_size": os.path.getsize(compressed),
+        }
+
     path = _table_path(table_name)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    return {"compression": "none", "raw_size": size, "disk_size": size}
+
+
+def table_log_size(table_name: str) -> int:
+    """Размер журнала изменений таблицы, байт (0, если журнала нет)."""
+    path = _log_path(table_name)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def db_base_dir() -> str:
+    """Каталог базы: в нём лежат файл метаданных и каталог data/."""
+    return os.path.dirname(os.path.abspath(META_FILE))
+
+
+def db_files() -> list[tuple[str, str]]:
+    """
+    Все файлы базы: json-файлы метаданных и файлы таблиц в data/.
+    Возвращает пары (путь относительно каталога базы, абсолютный путь).
+    """
+    base_dir = db_base_dir()
+    files = []
+    for name in (META_FILE, STATS_FILE, OPTIONS_FILE, VIEWS_FILE):
+        path = os.path.abspath(name)
+        if os.path.exists(path):
+            files.append((os.path.relpath(path, base_dir), path))
+    for name in sorted(os.listdir(_data_dir())):
+        if name.endswith(TABLE_FILE_SUFFIXES):
+            path = os.path.join(_data_dir(), name)
+            files.append((os.path.relpath(path, base_dir), path))
+    return files
@@ -0,0 +1,83 @@
+# src/primitive_db/views.py
+
+from .constants import VIEWS_FILE
+from .core import matching_rows, view_delta
+from .utils import (
+    append_table_log,
+    iter_table_rows,
+    load_metadata,
+    remove_table_data,
+    save_metadata,
+    save_table_data,
+)
+
+
+def load_views() -> dict:
+    """Определения представлений: имя -> {"table": ..., "where": ...}."""
+    return load_metadata(VIEWS_FILE)
+
+
+def view_source(name: str) -> str | None:
+    """Базовая таблица представления или None, если name — не представление."""
+    view = load_views().get(name)
+    return view["table"] if view else None
+
+
+def create_view(metadata: dict, name: str, table: str, where_clause) -> None:
+    views = load_views()
+    if name in metadata or name in views:
+        print(f'Ошибка: Таблица или представление "{name}" уже существует.')
+        return
+    if table not in metadata:
+        print(f'Ошибка: Таблица "{table}" не существует.')
+        return
+
+    rows = matching_rows(iter_table_rows(table), where_clause)
+    save_table_data(name, rows)
+    views[name] = {"table": table, "where": where_clause}
+    save_metadata(VIEWS_FILE, views)
+    print(f'Представление "{name}" создано, записей: {len(rows)}.')
+
+
+def drop_view(name: str) -> bool:
+    views = load_views()
+    if name not in views:
+        return False
+    del views[name]
+    save_metadata(VIEWS_FILE, views)
+    remove_table_data(name)
+    return True
+
+
+def drop_views_of(table: str) -> None:
+    """Удаляет представления над удалённой таблицей."""
+    for name, view in load_views().items():
+        if view["table"] == table:
+            drop_view(name)
+
+
+def refresh_views(table: str, changed_rows: list[dict], removed_ids: set) -> None:
+    """
+    Применяет к представлениям над table только изменившиеся записи
+    (вставленные/обновлённые и ID удалённых), без пересчёта по всей таблице:
+    изменения дописываются в журнал представления, как и у таблиц.
+    """
+    if not changed_rows and not removed_ids:
+        return
+    for name, view in load_views().items():
+        if view["table"] != table:
+            continue
+        put, removed = view_delta(
+            view["where"], changed_rows, removed_ids, _view_ids(name)
+        )
+        append_table_log(name, put, removed)
+
+
+def _view_ids(name: str):
+    def in_view(ids: set) -> set:
+        # читается только столбец ID, и только когда есть что удалять
+        return {
+            row["ID"] for row in iter_table_rows(name, ["ID"]) if row["ID"] in ids
+        }
+
+    return in_view
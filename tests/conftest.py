@@ -0,0 +1,30 @@
+# tests/conftest.py
+
+import builtins
+
+import pytest
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Пустая база во временном каталоге (файлы ищутся относительно cwd)."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def run_commands(db, monkeypatch, capsys):
+    """
+    Прогоняет команды через engine.run() и возвращает напечатанное.
+    Подтверждения confirm_action идут в общем списке ответов ("y"/"n").
+    """
+    from src.primitive_db import engine
+
+    def _run(*commands: str) -> str:
+        answers = iter([*commands, "exit"])
+        monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+        capsys.readouterr()
+        engine.run()
+        return capsys.readouterr().out
+
+    return _run
@@ -0,0 +1,68 @@
+# tests/test_backup.py
+
+import threading
+
+from src.primitive_db import engine
+from src.primitive_db.backup import backup_database, resolve_snapshot, verify_snapshot
+from src.primitive_db.utils import load_table_data
+
+
+def test_backup_is_incremental_and_restores(run_commands, db):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+        "vacuum users",
+        'insert into users values ("b", 2)',
+    )
+    first = backup_database("bk")
+    assert first["files"] == 3
+    assert first["copied"] == 1  # журнал; основной файл и метаданные — ссылки
+
+    second = backup_database("bk")
+    assert second["copied"] == 0 and second["copied_bytes"] == 0
+
+    run_commands("delete from users where ID = 1", "y", "create_table t x:int")
+    out = run_commands("restore from bk", "y")
+    assert "База восстановлена" in out
+    assert "- t" not in run_commands("list_tables")
+    assert [r["name"] for r in load_table_data("users")] == ["a", "b"]
+
+
+def test_corrupted_snapshot_is_rejected(run_commands, db):
+    run_commands("create_table users name:str", 'insert into users values ("a")')
+    snapshot = backup_database("bk")["snapshot"]
+    with open(db / snapshot / "data" / "users.log", "a", encoding="utf-8") as f:
+        f.write("мусор\n")
+    assert verify_snapshot(resolve_snapshot("bk")) == ["data/users.log"]
+
+    out = run_commands("restore from bk")
+    assert "повреждён" in out
+
+
+def test_snapshot_does_not_split_a_write(run_commands, db, monkeypatch):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+        "analyze users",
+    )
+    mark_stats_stale = engine._mark_stats_stale
+    backups = []
+
+    def mark_with_concurrent_backup(table):
+        # снимок, начатый между журналом и статистикой, ждёт конца записи
+        thread = threading.Thread(target=lambda: backups.append(backup_database("bk")))
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive()
+        backups.append(thread)
+        mark_stats_stale(table)
+
+    monkeypatch.setattr(engine, "_mark_stats_stale", mark_with_concurrent_backup)
+    run_commands('insert into users values ("b", 7)')
+    backups[0].join()
+    monkeypatch.setattr(engine, "_mark_stats_stale", mark_stats_stale)
+
+    run_commands("restore from bk", "y")
+    # статистика в снимке устаревшая, поэтому планировщик не пропустит таблицу
+    out = run_commands("select from users where age = 7")
+    assert "| 2  |  b   |  7  |" in out
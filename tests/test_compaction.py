@@ -0,0 +1,79 @@
+# tests/test_compaction.py
+
+import os
+import threading
+import time
+
+import pytest
+
+from src.primitive_db import compaction
+from src.primitive_db.utils import (
+    append_table_log,
+    compact_table_data,
+    load_table_data,
+    save_table_data,
+)
+
+
+@pytest.fixture
+def fast_compaction(db, monkeypatch):
+    monkeypatch.setattr(compaction, "COMPACTION_INTERVAL", 0.01)
+    monkeypatch.setattr(compaction, "COMPACTION_MIN_LOG_BYTES", 1)
+    yield
+    compaction.stop_background_compaction()
+    compaction._history.clear()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "условие не выполнилось вовремя"
+        time.sleep(0.01)
+
+
+def _leftovers(db):
+    return [n for n in os.listdir(db / "data") if ".compact" in n or ".tmp" in n]
+
+
+def _fill(table, count):
+    save_table_data(table, [])
+    rows = [{"ID": i, "name": "x" * 100} for i in range(1, count + 1)]
+    append_table_log(table, rows)
+    return rows
+
+
+def test_stop_event_aborts_compaction(db):
+    rows = _fill("t", 100)
+    stop = threading.Event()
+    stop.set()
+    assert compact_table_data("t", stop=stop) is None
+    assert _leftovers(db) == []
+    assert (db / "data" / "t.log").exists()
+    assert load_table_data("t") == rows
+
+
+def test_stop_interrupts_throttled_write(fast_compaction, db):
+    rows = _fill("t", 2000)  # ~250 КБ журнала
+    compaction.start_background_compaction(lambda: ["t"], io_budget=16 * 1024)
+    _wait_for(lambda: _leftovers(db))
+
+    t0 = time.monotonic()
+    assert compaction.stop_background_compaction()
+    assert time.monotonic() - t0 < 1.0
+    assert _leftovers(db) == []
+    assert load_table_data("t") == rows
+
+
+def test_broken_table_does_not_kill_thread(fast_compaction, db):
+    _fill("t", 3)
+    (db / "data" / "bad.json").write_text('[{"ID": 1,', encoding="utf-8")
+    append_table_log("bad", [{"ID": 2}])
+
+    compaction.start_background_compaction(lambda: ["bad", "t"])
+    _wait_for(lambda: not (db / "data" / "t.log").exists())
+
+    status = compaction.compaction_status()
+    assert status["running"]
+    errors = [r["error"] for table, r in status["history"] if table == "bad"]
+    assert errors
+    assert not compaction.start_background_compaction(lambda: [])
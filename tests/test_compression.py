@@ -0,0 +1,57 @@
+# tests/test_compression.py
+
+import pytest
+
+from src.primitive_db.compression import decode_table, encode_table
+from src.primitive_db.utils import load_table_data, table_storage_info
+
+ROWS = [
+    {"ID": i, "name": "abc"[i % 3], "active": i % 2 == 0, "age": i * 10}
+    for i in range(1, 50)
+]
+
+
+@pytest.mark.parametrize("codec", ["columnar", "zlib", "lzma"])
+def test_roundtrip(codec):
+    blob = encode_table(ROWS, codec, 0)
+    assert decode_table(blob, None) == ROWS
+    assert decode_table(blob, ["ID", "age"]) == [
+        {"ID": r["ID"], "age": r["age"]} for r in ROWS
+    ]
+
+
+def test_alter_compression_folds_log(run_commands, db):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+        'insert into users values ("b", 2)',
+        "update users set age = 5 where ID = 1",
+    )
+    expected = load_table_data("users")
+
+    out = run_commands("alter table users set compression zlib")
+    assert "изменено на zlib" in out
+    assert table_storage_info("users")["compression"] == "zlib"
+    assert not (db / "data" / "users.log").exists()
+    assert load_table_data("users") == expected
+
+    run_commands("alter table users set compression none")
+    assert (db / "data" / "users.json").exists()
+    assert not (db / "data" / "users.tbl").exists()
+    assert load_table_data("users") == expected
+
+
+def test_info_sizes_exclude_log(run_commands, db):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+    )
+    out = run_commands("info users")
+    assert "Размер: исходный 0 байт, на диске 0 байт" in out
+    log_size = (db / "data" / "users.log").stat().st_size
+    assert f"Журнал изменений: {log_size} байт" in out
+
+    run_commands("alter table users set compression zlib")
+    info = table_storage_info("users")
+    assert info["disk_size"] == (db / "data" / "users.tbl").stat().st_size
+    assert info["raw_size"] > 0
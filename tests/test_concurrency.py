@@ -0,0 +1,41 @@
+# tests/test_concurrency.py
+
+import subprocess
+import sys
+from pathlib import Path
+
+from src.primitive_db.utils import load_table_data
+
+ROOT = Path(__file__).resolve().parents[1]
+
+INSERTER = """
+import sys
+sys.path.insert(0, {root!r})
+from src.primitive_db import engine
+from src.primitive_db.utils import load_metadata
+
+metadata = load_metadata(engine.META_FILE)
+for i in range(30):
+    command = f'insert into t values ("p{{sys.argv[1]}}-{{i}}")'
+    plan = engine._get_plan(command, metadata)
+    engine._execute_plan(plan, metadata)
+"""
+
+
+def test_concurrent_processes_get_distinct_ids(run_commands, db):
+    run_commands("create_table t name:str")
+    script = INSERTER.format(root=str(ROOT))
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", script, str(n)],
+            cwd=db,
+            stdout=subprocess.DEVNULL,
+        )
+        for n in range(3)
+    ]
+    for proc in procs:
+        assert proc.wait(timeout=60) == 0
+
+    rows = load_table_data("t")
+    assert len(rows) == 90
+    assert sorted(r["ID"] for r in rows) == list(range(1, 91))
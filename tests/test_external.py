@@ -0,0 +1,65 @@
+# tests/test_external.py
+
+import pytest
+
+from src.primitive_db.external import (
+    distinct_rows,
+    external_sort,
+    group_count,
+    memory_budget,
+    set_memory_budget,
+)
+
+ROWS = [{"ID": i, "k": i % 7, "s": f"v{i % 5}"} for i in range(1, 400)]
+
+
+@pytest.fixture
+def tiny_budget(db):
+    """Бюджет памяти в несколько записей: всё уходит во временные файлы."""
+    budget = memory_budget()
+    set_memory_budget(2048)
+    yield
+    set_memory_budget(budget)
+
+
+def test_external_sort(tiny_budget):
+    result = list(external_sort(iter(ROWS), "k", descending=True))
+    assert result == sorted(ROWS, key=lambda r: r["k"], reverse=True)
+
+
+def test_distinct_and_group_count(tiny_budget):
+    distinct = list(distinct_rows({"s": r["s"]} for r in ROWS))
+    assert sorted(r["s"] for r in distinct) == [f"v{i}" for i in range(5)]
+
+    counts = {r["k"]: r["count"] for r in group_count(iter(ROWS), "k", "count")}
+    assert counts == {k: sum(1 for r in ROWS if r["k"] == k) for k in range(7)}
+
+
+def test_plain_select_streams_without_select_cache(run_commands, tiny_budget):
+    inserts = [f'insert into t values ("r{i}")' for i in range(40)]
+    run_commands("create_table t name:str", *inserts)
+
+    out = run_commands("select from t")
+    assert "Функция select " not in out
+    assert "Функция scan выполнилась" in out
+    assert all(f" r{i} " in out for i in range(40))
+    # записи сверх бюджета памяти выводятся несколькими таблицами
+    assert out.count("| ID | name |") > 1
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("budget", [None, 2048])
+def test_rows_without_column_sort_last(db, descending, budget):
+    saved = memory_budget()
+    if budget:
+        set_memory_budget(budget)
+    try:
+        rows = [{"ID": i, "k": None if i % 4 == 0 else i % 5} for i in range(1, 60)]
+        result = list(external_sort(iter(rows), "k", descending))
+    finally:
+        set_memory_budget(saved)
+
+    present = [r["k"] for r in result if r["k"] is not None]
+    assert present == sorted(present, reverse=descending)
+    missing = [r for r in result if r["k"] is None]
+    assert result[len(present) :] == missing and len(missing) == 14
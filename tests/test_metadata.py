@@ -0,0 +1,59 @@
+# tests/test_metadata.py
+
+import json
+import os
+import subprocess
+import sys
+
+from src.primitive_db.utils import data_dir, load_metadata, save_metadata
+
+
+def test_cached_metadata_is_a_copy(db):
+    save_metadata("meta.json", {"users": ["ID:int", "name:str"]})
+    first = load_metadata("meta.json")
+    first["users"].append("age:int")
+    first["extra"] = []
+    assert load_metadata("meta.json") == {"users": ["ID:int", "name:str"]}
+
+
+def test_reloads_file_written_on_disk(db):
+    save_metadata("meta.json", {"a": 1})
+    assert load_metadata("meta.json") == {"a": 1}
+
+    # другой размер, запись на месте (тот же inode)
+    with open("meta.json", "w", encoding="utf-8") as f:
+        json.dump({"a": 1, "b": 2}, f)
+    assert load_metadata("meta.json") == {"a": 1, "b": 2}
+
+    # тот же размер: изменение видно по mtime
+    with open("meta.json", "w", encoding="utf-8") as f:
+        json.dump({"a": 1, "b": 3}, f)
+    st = os.stat("meta.json")
+    os.utime("meta.json", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_metadata("meta.json") == {"a": 1, "b": 3}
+
+    os.remove("meta.json")
+    assert load_metadata("meta.json") == {}
+
+
+def test_reloads_file_written_by_another_process(db):
+    save_metadata("meta.json", {"a": 1})
+    assert load_metadata("meta.json") == {"a": 1}
+    script = (
+        "import json; json.dump({'a': 2, 'from': 'child'}, "
+        "open('meta.json', 'w', encoding='utf-8'))"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=db, check=True)
+    assert load_metadata("meta.json") == {"a": 2, "from": "child"}
+
+
+def test_data_dir_follows_database_dir(db, monkeypatch):
+    first = data_dir()
+    assert first == str(db / "data") and os.path.isdir(first)
+    other = db / "other"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    assert data_dir() == str(other / "data")
+    assert os.path.isdir(other / "data")
+    monkeypatch.chdir(db)
+    assert data_dir() == first
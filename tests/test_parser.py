@@ -0,0 +1,69 @@
+# tests/test_parser.py
+
+import pytest
+
+from src.primitive_db.engine import _extract_select_parts
+from src.primitive_db.parser import (
+    PARAM,
+    parse_projection,
+    parse_value,
+    parse_where,
+)
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ('"Ann Lee"', "Ann Lee"),
+        ("'x'", "x"),
+        ("42", 42),
+        ("-7", -7),
+        ("TRUE", True),
+        ("false", False),
+        ("?", PARAM),
+        ("bare", None),
+    ],
+)
+def test_parse_value(raw, expected):
+    assert parse_value(raw) == expected
+
+
+def test_parse_where():
+    assert parse_where("age = 5") == {"age": 5}
+    assert parse_where("age 5") is None
+
+
+@pytest.mark.parametrize(
+    "cols, expected",
+    [
+        ("*", []),
+        (" * ", []),
+        ("name", ["name"]),
+        ("name, age", ["name", "age"]),
+        ("age,name,age", ["age", "name"]),
+        ("", None),
+        ("name,", None),
+        ("first name", None),
+    ],
+)
+def test_parse_projection(cols, expected):
+    assert parse_projection(cols) == expected
+
+
+def test_extract_select_parts():
+    parts = _extract_select_parts(
+        'select distinct name, age from users where name = "x from y" '
+        "group by age order by age desc"
+    )
+    assert parts == {
+        "cols": "name, age",
+        "distinct": True,
+        "table": "users",
+        "where": 'name = "x from y"',
+        "group_by": "age",
+        "order_by": ("age", True),
+    }
+    assert _extract_select_parts("select from users")["cols"] == ""
+    assert _extract_select_parts("select * from users")["cols"] == "*"
+    assert _extract_select_parts("select name users") is None
+    assert _extract_select_parts("select from users order by age sideways") is None
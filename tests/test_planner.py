@@ -0,0 +1,81 @@
+# tests/test_planner.py
+
+from src.primitive_db import engine
+from src.primitive_db.planner import (
+    PATH_FULL_SCAN,
+    PATH_ID_LOOKUP,
+    PATH_SKIP,
+    PATH_TITLES,
+    analyze_table,
+    choose_access_path,
+)
+from src.primitive_db.utils import load_table_data
+
+ROWS = [{"ID": i, "name": f"n{i}", "age": i % 3} for i in range(1, 31)]
+
+
+def _stats(rows=ROWS):
+    return analyze_table(rows, ["ID:int", "name:str", "age:int"])
+
+
+def test_access_paths():
+    stats = _stats()
+    assert choose_access_path({"ID": 5}, None)["path"] == PATH_ID_LOOKUP
+    assert choose_access_path({"ID": 5}, stats)["path"] == PATH_ID_LOOKUP
+    assert choose_access_path({"age": 1}, stats)["path"] == PATH_FULL_SCAN
+    assert choose_access_path({"age": 7}, stats)["path"] == PATH_SKIP
+    # устаревшая статистика не даёт пропустить таблицу
+    stats["stale"] = True
+    assert choose_access_path({"age": 7}, stats)["path"] == PATH_FULL_SCAN
+
+
+def test_unique_column_needs_fresh_stats():
+    stats = _stats()
+    assert choose_access_path({"name": "n3"}, stats)["path"] == PATH_ID_LOOKUP
+    stats["stale"] = True
+    assert choose_access_path({"name": "n3"}, stats)["path"] == PATH_FULL_SCAN
+
+
+def test_id_lookup_stops_at_first_match(run_commands, monkeypatch):
+    inserts = [f'insert into t values ("n{i}")' for i in range(50)]
+    run_commands("create_table t name:str", *inserts)
+
+    read = []
+    iter_table_rows = engine.iter_table_rows
+
+    def counting_rows(*args, **kwargs):
+        for row in iter_table_rows(*args, **kwargs):
+            read.append(row["ID"])
+            yield row
+
+    monkeypatch.setattr(engine, "iter_table_rows", counting_rows)
+    out = run_commands("select from t where ID = 3")
+    assert "n2" in out
+    assert read == [1, 2, 3]
+
+    read.clear()
+    run_commands('select from t where name = "n2"')
+    assert len(read) == 50  # без статистики name не считается уникальным
+
+
+def test_reused_id_makes_column_non_unique(run_commands):
+    run_commands(
+        "create_table users name:str",
+        'insert into users values ("a")',
+        'insert into users values ("b")',
+        'insert into users values ("c")',
+        "analyze users",
+    )
+    out = run_commands('explain select from users where name = "a"')
+    assert PATH_TITLES[PATH_ID_LOOKUP] in out
+
+    # ID 3 освобождается и достаётся новой записи с повторным именем
+    run_commands(
+        "delete from users where ID = 3", "y", 'insert into users values ("a")'
+    )
+    assert [r["ID"] for r in load_table_data("users")] == [1, 2, 3]
+
+    for refresh in ([], ["analyze users"]):
+        run_commands(*refresh)
+        out = run_commands('select from users where name = "a"')
+        assert "| 1  |" in out and "| 3  |" in out
@@ -0,0 +1,99 @@
+# tests/test_prepared.py
+
+from src.primitive_db.decorators import create_lru_cacher
+from src.primitive_db.utils import load_table_data
+
+
+def test_prepare_and_execute(run_commands):
+    out = run_commands(
+        "create_table users name:str age:int",
+        "prepare add as insert into users values (?, ?)",
+        'execute add ("a", 30)',
+        'execute add ("b", 20)',
+        "prepare older as select name from users where age = ?",
+        "prepare rename as update users set name = ? where ID = ?",
+        'execute rename ("bb", 2)',
+    )
+    assert 'Выражение "add" подготовлено (параметров: 2).' in out
+    out = run_commands("execute older (30)")
+    assert "|  a   |" in out and "bb" not in out
+    assert load_table_data("users") == [
+        {"ID": 1, "name": "a", "age": 30},
+        {"ID": 2, "name": "bb", "age": 20},
+    ]
+
+
+def test_execute_errors(run_commands):
+    out = run_commands(
+        "create_table users name:str age:int",
+        "prepare add as insert into users values (?, ?)",
+        'execute add ("a")',
+        "execute missing (1)",
+        "prepare bad as drop_table users",
+        "prepare older as select from users where age = ?",
+        "execute older (old)",
+    )
+    assert "ожидается параметров: 2, передано: 1" in out
+    assert 'Подготовленное выражение "missing" не найдено' in out
+    assert "подготовить можно только insert/select/update/delete" in out
+    assert "Некорректное значение: old." in out
+    assert load_table_data("users") == []
+
+
+def test_bare_param_outside_prepare(run_commands):
+    out = run_commands(
+        "create_table users name:str age:int",
+        "insert into users values (?, 1)",
+        "select from users where age = ?",
+    )
+    assert out.count("параметр ? допустим только в prepare") == 2
+    assert load_table_data("users") == []
+
+
+def test_prepared_plan_rebuilt_after_schema_change(run_commands):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+        "prepare names as select name from users where age = ?",
+    )
+    assert "|  a   |" in run_commands("execute names (1)")
+
+    run_commands("drop_table users", "y", "create_table users nick:str age:int")
+    out = run_commands("execute names (1)")
+    assert 'Столбец "name" не найден в таблице "users"' in out
+
+
+def test_cached_plan_follows_view_changes(run_commands):
+    run_commands(
+        "create_table users name:str age:int",
+        "create view v as select from users where age = 1",
+    )
+    out = run_commands('insert into v values ("a", 1)')
+    assert '"v" — представление' in out
+
+    run_commands("drop view v", "create_table v name:str age:int")
+    out = run_commands('insert into v values ("a", 1)')
+    assert 'успешно добавлена в таблицу "v"' in out
+
+    run_commands("drop_table v", "y", "create view v as select from users")
+    out = run_commands('insert into v values ("a", 1)')
+    assert '"v" — представление' in out
+
+
+def test_lru_cacher_evicts_and_revalidates():
+    cache = create_lru_cacher(2)
+    calls = []
+
+    def value(key):
+        calls.append(key)
+        return key.upper()
+
+    assert cache("a", lambda: value("a")) == "A"
+    assert cache("b", lambda: value("b")) == "B"
+    assert cache("a", lambda: value("a")) == "A"  # "a" снова свежий
+    cache("c", lambda: value("c"))  # вытесняет давно не использованный "b"
+    cache("b", lambda: value("b"))
+    assert calls == ["a", "b", "c", "b"]
+
+    cache("b", lambda: value("b"), is_valid=lambda v: False)
+    assert calls[-1] == "b" and len(calls) == 5
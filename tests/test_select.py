@@ -0,0 +1,70 @@
+# tests/test_select.py
+
+import pytest
+
+from src.primitive_db.utils import iter_table_rows
+
+
+def _table_lines(out: str) -> list[list[str]]:
+    """Строки таблиц prettytable из вывода: [[ячейка, ...], ...]."""
+    return [
+        [cell.strip() for cell in line.strip("|").split("|")]
+        for line in out.splitlines()
+        if line.startswith("|")
+    ]
+
+
+@pytest.fixture
+def users(run_commands):
+    run_commands(
+        "create_table users name:str age:int active:bool",
+        'insert into users values ("a", 30, true)',
+        'insert into users values ("b", 20, false)',
+        'insert into users values ("c", 30, false)',
+    )
+    return run_commands
+
+
+def test_select_all_and_star(users):
+    expected = [
+        ["ID", "name", "age", "active"],
+        ["1", "a", "30", "True"],
+        ["2", "b", "20", "False"],
+        ["3", "c", "30", "False"],
+    ]
+    assert _table_lines(users("select from users")) == expected
+    assert _table_lines(users("select * from users")) == expected
+
+
+def test_projection_keeps_requested_order(users):
+    out = users("select age, name from users")
+    assert _table_lines(out) == [
+        ["age", "name"],
+        ["30", "a"],
+        ["20", "b"],
+        ["30", "c"],
+    ]
+
+
+def test_where_column_is_loaded_but_not_shown(users):
+    out = users("select name from users where active = false")
+    assert _table_lines(out) == [["name"], ["b"], ["c"]]
+
+
+def test_unknown_column(users):
+    out = users("select name, salary from users")
+    assert 'Столбец "salary" не найден в таблице "users"' in out
+    out = users("select name, age, from users")
+    assert "Некорректное значение: список столбцов" in out
+
+
+@pytest.mark.parametrize("codec", ["columnar", "zlib"])
+def test_projection_on_compressed_table(users, codec):
+    users(f"alter table users set compression {codec}")
+    assert list(iter_table_rows("users", ["name"])) == [
+        {"name": "a"},
+        {"name": "b"},
+        {"name": "c"},
+    ]
+    out = users("select name from users where age = 30")
+    assert _table_lines(out) == [["name"], ["a"], ["c"]]
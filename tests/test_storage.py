@@ -0,0 +1,140 @@
+# tests/test_storage.py
+
+import json
+import threading
+
+from src.primitive_db import utils
+from src.primitive_db.utils import (
+    _log_path,
+    append_table_log,
+    compact_table_data,
+    load_table_data,
+    save_table_data,
+)
+
+ROWS = [
+    {"ID": 1, "name": "a", "age": 10},
+    {"ID": 2, "name": "b", "age": 20},
+    {"ID": 3, "name": "c", "age": 30},
+]
+
+
+def _ids(rows):
+    return [row["ID"] for row in rows]
+
+
+def test_update_of_id_is_rejected(run_commands):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+        'insert into users values ("b", 2)',
+    )
+    out = run_commands("update users set ID = 1 where ID = 2")
+    assert "Столбец ID нельзя изменять" in out
+    out = run_commands("update users set id = 10 where ID = 1")
+    assert "Столбец ID нельзя изменять" in out
+
+    rows = load_table_data("users")
+    assert rows == [
+        {"ID": 1, "name": "a", "age": 1},
+        {"ID": 2, "name": "b", "age": 2},
+    ]
+
+
+def test_update_replay_and_vacuum(run_commands):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+        'insert into users values ("b", 2)',
+        'insert into users values ("c", 3)',
+        "update users set age = 20 where ID = 2",
+        "delete from users where ID = 1",
+        "y",
+    )
+    expected = [
+        {"ID": 2, "name": "b", "age": 20},
+        {"ID": 3, "name": "c", "age": 3},
+    ]
+    assert load_table_data("users") == expected
+
+    out = run_commands("vacuum users")
+    assert 'Таблица "users": освобождено' in out
+    assert load_table_data("users") == expected
+
+
+def test_log_replay_over_base(db):
+    save_table_data("t", ROWS)
+    append_table_log("t", [{"ID": 2, "name": "b2", "age": 21}], {1})
+    append_table_log("t", [{"ID": 4, "name": "d", "age": 40}])
+    # удалённая и вставленная заново запись переезжает в конец
+    append_table_log("t", [], {3})
+    append_table_log("t", [{"ID": 3, "name": "c2", "age": 31}])
+
+    rows = load_table_data("t")
+    assert _ids(rows) == [2, 4, 3]
+    assert rows[0]["name"] == "b2"
+    assert load_table_data("t", ["name"]) == [
+        {"name": "b2"},
+        {"name": "d"},
+        {"name": "c2"},
+    ]
+
+
+def test_log_skips_torn_line(db):
+    save_table_data("t", ROWS)
+    with open(_log_path("t"), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"del": 1}) + "\n" + '{"put": {"ID": 9')
+    assert _ids(load_table_data("t")) == [2, 3]
+
+
+def test_vacuum_merges_log(db):
+    save_table_data("t", ROWS)
+    append_table_log("t", [{"ID": 2, "name": "b", "age": 99}], {3})
+    expected = load_table_data("t")
+
+    report = compact_table_data("t")
+    assert report is not None
+    assert report["reclaimed"] > 0
+    assert not (db / "data" / "t.log").exists()
+    assert load_table_data("t") == expected
+
+
+def test_vacuum_keeps_log_tail_and_does_not_block_writers(db, monkeypatch):
+    save_table_data("t", ROWS)
+    append_table_log("t", [], {1})
+    write_stream = utils._write_stream
+    new_row = {"ID": 4, "name": "d", "age": 4}
+
+    def write_with_concurrent_insert(path, chunks, io_budget=None, stop=None):
+        # другой поток пишет в таблицу, пока компакция пишет новый файл
+        if path.endswith(".compact"):
+            writer = threading.Thread(target=append_table_log, args=("t", [new_row]))
+            writer.start()
+            writer.join(timeout=5)
+            assert not writer.is_alive(), "запись ждала окончания компакции"
+        return write_stream(path, chunks, io_budget, stop)
+
+    monkeypatch.setattr(utils, "_write_stream", write_with_concurrent_insert)
+    # таблица читается потоком, а не загружается целиком
+    monkeypatch.setattr(utils, "load_table_data", None)
+    report = compact_table_data("t")
+
+    assert report is not None
+    assert _ids(load_table_data("t")) == [2, 3, 4]
+    # в журнале остался только хвост, дописанный во время компакции
+    with open(_log_path("t"), encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [{"put": new_row}]
+
+
+def test_vacuum_never_reports_negative_reclaim(run_commands):
+    out = run_commands("create_table empty name:str", "vacuum empty")
+    assert "освобождено 0 байт" in out
+
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+        'insert into users values ("b", 2)',
+    )
+    report = compact_table_data("users")
+    assert report["reclaimed"] > 0
+    assert compact_table_data("users")["reclaimed"] == 0
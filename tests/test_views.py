@@ -0,0 +1,77 @@
+# tests/test_views.py
+
+from src.primitive_db.core import view_delta
+from src.primitive_db.utils import load_table_data
+
+
+def test_view_follows_updates(run_commands):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 1)',
+        'insert into users values ("b", 2)',
+        "create view adults as select from users where age = 2",
+        "update users set age = 2 where ID = 1",
+        "update users set age = 3 where ID = 2",
+    )
+    assert load_table_data("adults") == [{"ID": 1, "name": "a", "age": 2}]
+
+    run_commands("delete from users where ID = 1", "y")
+    assert load_table_data("adults") == []
+
+
+def test_view_delta():
+    changed = [{"ID": 2, "v": 0}, {"ID": 3, "v": 1}, {"ID": 4, "v": 0}]
+    asked = []
+
+    def in_view(ids):
+        asked.append(set(ids))
+        return ids & {1, 2}
+
+    put, removed = view_delta({"v": 1}, changed, {1, 5}, in_view)
+    assert put == [{"ID": 3, "v": 1}]
+    assert removed == {1, 2}
+    assert asked == [{1, 2, 4, 5}]
+
+
+def test_view_is_not_rewritten_by_unrelated_writes(run_commands, db):
+    run_commands(
+        "create_table users name:str age:int",
+        'insert into users values ("a", 2)',
+        "create view v as select from users where age = 2",
+    )
+    view_file = db / "data" / "v.json"
+    view_log = db / "data" / "v.log"
+    base_stat = view_file.stat()
+
+    run_commands(
+        'insert into users values ("b", 3)',
+        "update users set name = \"bb\" where ID = 2",
+        "delete from users where ID = 2",
+        "y",
+    )
+    assert not view_log.exists()
+
+    run_commands('insert into users values ("c", 2)')
+    assert view_file.stat().st_mtime_ns == base_stat.st_mtime_ns
+    assert load_table_data("v") == [
+        {"ID": 1, "name": "a", "age": 2},
+        {"ID": 2, "name": "c", "age": 2},
+    ]
+
+    out = run_commands("vacuum v")
+    assert 'Таблица "v": освобождено' in out
+    assert not view_log.exists()
+    assert len(load_table_data("v")) == 2
+
+
+def test_view_rejects_clauses_it_cannot_store(run_commands, db):
+    run_commands("create_table users name:str age:int")
+    for text in (
+        "create view v as select from users order by age desc",
+        "create view v as select distinct from users where age = 2 order by name",
+        "create view v as select age from users group by age",
+        "create view v as select name from users",
+    ):
+        out = run_commands(text)
+        assert "ожидается create view" in out, text
+    assert not (db / "db_views.json").exists()